@@ -0,0 +1,106 @@
+"""Read settings from ``.beads/config.yaml`` the way ``bd`` resolves them.
+
+``bd`` lets every key be overridden by a ``BEADS_*`` / ``BD_*``
+environment variable; :func:`setting` applies the same precedence.  PyYAML
+is used when installed, otherwise a small parser handles the block-style
+mappings and lists the config file uses.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from paths import beads_dir
+
+_cache: Dict[Path, tuple] = {}
+
+
+def load_config(path: Optional[os.PathLike] = None) -> Dict[str, Any]:
+    """Parsed config file, cached until its mtime changes."""
+    path = Path(path) if path is not None else beads_dir() / "config.yaml"
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    text = path.read_text()
+    try:
+        import yaml
+    except ImportError:
+        data = _parse_simple(text)
+    else:
+        data = yaml.safe_load(text) or {}
+    _cache[path] = (mtime, data)
+    return data
+
+
+def setting(key: str, default: Any = None) -> Any:
+    """Value of ``key``, letting ``BEADS_<KEY>`` or ``BD_<KEY>`` override it."""
+    env_key = key.upper().replace("-", "_").replace(".", "_")
+    for prefix in ("BEADS_", "BD_"):
+        value = os.environ.get(prefix + env_key)
+        if value is not None:
+            return value
+    return load_config().get(key, default)
+
+
+def as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def _parse_simple(text: str) -> Dict[str, Any]:
+    """Parse block-style mappings and scalar lists, which is all the
+    config file uses; flow style and multi-line scalars are not handled."""
+    lines = []
+    for raw in text.splitlines():
+        content = raw.split(" #", 1)[0].rstrip()
+        if content.strip() and not content.lstrip().startswith("#"):
+            lines.append((len(content) - len(content.lstrip()), content.strip()))
+    value, _ = _parse_block(lines, 0, 0)
+    return value if isinstance(value, dict) else {}
+
+
+def _parse_block(lines: List[Tuple[int, str]], i: int, indent: int) -> Tuple[Any, int]:
+    if i < len(lines) and lines[i][1].startswith("- "):
+        items = []
+        while i < len(lines) and lines[i][0] == indent and lines[i][1].startswith("- "):
+            items.append(_scalar(lines[i][1][2:].strip()))
+            i += 1
+        return items, i
+
+    mapping: Dict[str, Any] = {}
+    while i < len(lines) and lines[i][0] == indent:
+        key, sep, value = lines[i][1].partition(":")
+        i += 1
+        if not sep:
+            continue
+        value = value.strip()
+        # A nested block is indented, except a list, which YAML also
+        # allows at the key's own indentation.
+        if not value and i < len(lines) and (
+            lines[i][0] > indent or (lines[i][0] == indent and lines[i][1].startswith("- "))
+        ):
+            mapping[key.strip()], i = _parse_block(lines, i, lines[i][0])
+        else:
+            mapping[key.strip()] = _scalar(value)
+    return mapping, i
+
+
+def _scalar(value: str) -> Any:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in ("", "null", "~"):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
@@ -0,0 +1,346 @@
+"""Keyed three-way merge driver for ``.beads/issues.jsonl``.
+
+``.gitattributes`` routes the issue export through ``merge=beads``.  This
+module is a Python implementation of that driver::
+
+    git config merge.beads.driver "python3 .claude/lib/beads_merge.py %O %A %B"
+
+Each side is indexed by issue ``id`` in a single pass; records are compared
+as raw lines, and only ids changed on both sides are parsed and merged
+field by field, so the whole merge is O(n) hashed lookups.
+
+Resolution rules, applied per id:
+
+* a side identical to base yields to the other side (deletions included);
+* a deletion on one side loses to a modification on the other;
+* when both sides modified a record, fields changed on only one side are
+  taken from it; list fields (labels, dependencies, comments) merge as
+  sets; ``updated_at`` takes the later value; for other fields changed on
+  both sides the side with the newer ``updated_at`` wins;
+* a close on one side beats a reopen on the other unless the reopening
+  side was updated after ``closed_at``; ``closed_at`` is kept consistent
+  with the resulting status.
+
+The rules are symmetric, so swapping the two sides produces the same file.
+Output is sorted by id, like ``bd export``.
+
+``python3 beads_merge.py bench`` times the merge on synthetic 10k/100k
+issue files; the convergence properties are checked by
+``.claude/tests/test_beads_merge.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+Raw = Optional[bytes]
+Issue = Dict[str, object]
+
+_ID_PREFIX = b'{"id":"'
+
+
+class MergeError(ValueError):
+    """An input is not a valid issues JSONL file (e.g. has conflict markers)."""
+
+
+def index_lines(data: bytes, source: str = "<input>") -> Dict[bytes, bytes]:
+    """Map each issue id (as UTF-8 bytes) to its raw JSON line.
+
+    Later duplicates win.  bd writes ``"id"`` first, so the id is sliced
+    out of the line directly; other lines fall back to ``json.loads``.
+    """
+    index: Dict[bytes, bytes] = {}
+    start = len(_ID_PREFIX)
+    for lineno, line in enumerate(data.split(b"\n"), 1):
+        if line[:start] == _ID_PREFIX:
+            end = line.find(b'"', start)
+            if end > 0:
+                key = line[start:end]
+                if b"\\" not in key:
+                    index[key] = line.rstrip()
+                    continue
+        line = line.strip()
+        if line:
+            index[_parse_id(line, source, lineno)] = line
+    return index
+
+
+def _parse_id(line: bytes, source: str, lineno: int) -> bytes:
+    try:
+        issue = json.loads(line)
+    except ValueError:
+        raise MergeError(f"{source}:{lineno}: not valid JSON") from None
+    issue_id = issue.get("id") if isinstance(issue, dict) else None
+    if not isinstance(issue_id, str):
+        raise MergeError(f"{source}:{lineno}: record has no string id")
+    return issue_id.encode()
+
+
+def merge_indexes(
+    base: Dict[bytes, bytes], left: Dict[bytes, bytes], right: Dict[bytes, bytes]
+) -> Tuple[List[bytes], int]:
+    """Merge three id indexes; return output lines and the number of
+    records that needed a field-level merge."""
+    merged: Dict[bytes, bytes] = {}
+    field_merges = 0
+    base_get = base.get
+    right_get = right.get
+    for issue_id, l in left.items():
+        r = right_get(issue_id)
+        if l == r:
+            merged[issue_id] = l
+            continue
+        b = base_get(issue_id)
+        if r == b:
+            merged[issue_id] = l
+        elif l == b:
+            if r is not None:
+                merged[issue_id] = r
+        elif r is None:
+            # Deleted on the right but edited here: the edit wins.
+            merged[issue_id] = l
+        else:
+            merged[issue_id] = _merge_record(b, l, r)
+            field_merges += 1
+    for issue_id, r in right.items():
+        # Absent on the left: either added on the right, or deleted on the
+        # left, which only stands if the right left the record untouched.
+        if issue_id not in left and r != base_get(issue_id):
+            merged[issue_id] = r
+    return [merged[i] for i in sorted(merged)], field_merges
+
+
+def _merge_record(b: Raw, l: bytes, r: bytes) -> bytes:
+    base: Issue = json.loads(b) if b is not None else {}
+    primary, secondary = _order(json.loads(l), json.loads(r))
+
+    out: Issue = {}
+    for key in list(primary) + [k for k in secondary if k not in primary]:
+        pv = primary.get(key, _MISSING)
+        sv = secondary.get(key, _MISSING)
+        bv = base.get(key, _MISSING)
+        if pv == sv or sv == bv:
+            value = pv
+        elif pv == bv:
+            value = sv
+        elif key == "updated_at":
+            value = max(pv, sv, key=_timestamp)
+        elif isinstance(pv, list) and isinstance(sv, list):
+            value = _merge_lists(bv if isinstance(bv, list) else [], pv, sv)
+        else:
+            value = pv
+        if value is not _MISSING:
+            out[key] = value
+
+    _resolve_status(out, primary, secondary, base)
+    return json.dumps(out, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+_MISSING = object()
+
+
+_EARLIEST = datetime.min.replace(tzinfo=timezone.utc)
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+
+
+def _timestamp(value: object) -> datetime:
+    """Sort key for an RFC 3339 timestamp.
+
+    The strings do not sort lexically: Go drops trailing zeros from the
+    fraction (``...:00Z`` vs ``...:00.5Z``) and offsets vary.  Missing or
+    unparseable values sort first; naive ones are taken as UTC.
+    """
+    if not isinstance(value, str):
+        return _EARLIEST
+    # fromisoformat() before 3.11 takes neither "Z" nor nanoseconds.
+    text = _FRACTION.sub(r"\1", value.strip())
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        stamp = datetime.fromisoformat(text)
+    except ValueError:
+        return _EARLIEST
+    return stamp if stamp.tzinfo is not None else stamp.replace(tzinfo=timezone.utc)
+
+
+def _order(a: Issue, b: Issue) -> Tuple[Issue, Issue]:
+    """Return ``(newer, older)`` by ``updated_at``, breaking ties on content
+    so the outcome does not depend on which side is "ours"."""
+    ka = (_timestamp(a.get("updated_at")), _canonical(a))
+    kb = (_timestamp(b.get("updated_at")), _canonical(b))
+    return (a, b) if ka >= kb else (b, a)
+
+
+def _canonical(value: object) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def _merge_lists(base: list, primary: list, secondary: list) -> list:
+    """Three-way set merge: keep additions from both sides, drop removals."""
+    removed = {_canonical(v) for v in base}
+    removed -= {_canonical(v) for v in primary} & {_canonical(v) for v in secondary}
+    out = []
+    seen = set()
+    for value in primary + secondary:
+        key = _canonical(value)
+        if key in seen or key in removed:
+            continue
+        seen.add(key)
+        out.append(value)
+    return out
+
+
+def _resolve_status(out: Issue, primary: Issue, secondary: Issue, base: Issue) -> None:
+    ps, ss = primary.get("status"), secondary.get("status")
+    if ps != ss and ps != base.get("status") and ss != base.get("status"):
+        if "closed" in (ps, ss):
+            closed, other = (primary, secondary) if ps == "closed" else (secondary, primary)
+            reopened_later = _timestamp(other.get("updated_at")) > _timestamp(
+                closed.get("closed_at")
+            )
+            winner = other if reopened_later else closed
+            out["status"] = winner.get("status")
+    if out.get("status") == "closed":
+        if not out.get("closed_at"):
+            stamps = [i.get("closed_at") for i in (primary, secondary) if i.get("closed_at")]
+            if stamps:
+                out["closed_at"] = max(stamps, key=_timestamp)
+    else:
+        out.pop("closed_at", None)
+
+
+def merge_files(base_path: str, left_path: str, right_path: str) -> Tuple[bytes, int]:
+    """Merge three JSONL files; a missing base is treated as empty.
+
+    Each file is read whole and indexed in memory rather than streamed:
+    the id indexes need every line anyway, and git hands the driver
+    regular files small enough to hold.
+    """
+    indexes = []
+    for path in (base_path, left_path, right_path):
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            data = b""
+        indexes.append(index_lines(data, path))
+    lines, field_merges = merge_indexes(*indexes)
+    return b"".join(line + b"\n" for line in lines), field_merges
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.merge.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+# -- synthetic data and benchmark ----------------------------------------
+
+
+def synthetic_issues(n: int, rng: random.Random) -> Dict[bytes, bytes]:
+    index = {}
+    for i in range(n):
+        issue = {
+            "id": f"bench-{i:07d}",
+            "title": f"Synthetic issue {i}",
+            "description": "x" * rng.randint(0, 120),
+            "status": rng.choice(["open", "in_progress", "blocked", "closed"]),
+            "priority": rng.randint(0, 4),
+            "issue_type": rng.choice(["task", "bug", "feature", "epic"]),
+            "created_at": "2025-01-01T00:00:00Z",
+            "updated_at": f"2025-01-{rng.randint(1, 28):02d}T00:00:00Z",
+            "labels": rng.sample(["a", "b", "c", "d"], rng.randint(0, 2)),
+        }
+        if issue["status"] == "closed":
+            issue["closed_at"] = issue["updated_at"]
+        index[issue["id"].encode()] = _dump(issue)
+    return index
+
+
+def mutate(
+    base: Dict[bytes, bytes], rng: random.Random, rate: float = 0.05
+) -> Dict[bytes, bytes]:
+    """A plausible branch of ``base``: edits, closes, reopens, adds, deletes."""
+    side = dict(base)
+    ids = list(base)
+    for issue_id in rng.sample(ids, int(len(ids) * rate)):
+        issue = json.loads(side[issue_id])
+        roll = rng.random()
+        if roll < 0.05:
+            del side[issue_id]
+            continue
+        stamp = f"2025-02-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+        issue["updated_at"] = stamp
+        if roll < 0.35:
+            issue["status"] = "closed"
+            issue["closed_at"] = stamp
+        elif roll < 0.5:
+            issue["status"] = "open"
+            issue.pop("closed_at", None)
+        elif roll < 0.75:
+            issue["priority"] = rng.randint(0, 4)
+        else:
+            issue["labels"] = sorted(set(issue["labels"]) | {rng.choice("wxyz")})
+        side[issue_id] = _dump(issue)
+    for _ in range(max(1, int(len(ids) * rate / 5))):
+        new_id = f"bench-new-{rng.getrandbits(48):012x}"
+        side[new_id.encode()] = _dump(
+            {"id": new_id, "title": "new", "status": "open", "updated_at": "2025-03-01T00:00:00Z"}
+        )
+    return side
+
+
+def _dump(issue: Issue) -> bytes:
+    return json.dumps(issue, separators=(",", ":")).encode()
+
+
+def bench(sizes=(10_000, 100_000), seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    report = []
+    for n in sizes:
+        base = synthetic_issues(n, rng)
+        left, right = mutate(base, rng), mutate(base, rng)
+        blobs = [b"".join(v + b"\n" for v in side.values()) for side in (base, left, right)]
+        started = time.perf_counter()
+        indexes = [index_lines(blob) for blob in blobs]
+        lines, field_merges = merge_indexes(*indexes)
+        _ = b"".join(line + b"\n" for line in lines)
+        elapsed = (time.perf_counter() - started) * 1000
+        report.append(
+            f"{n:>7} issues: {elapsed:8.1f}ms  ({field_merges} field-level merges, "
+            f"{len(lines)} records out)"
+        )
+    return report
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["bench"]:
+        for line in bench():
+            print(line)
+        return 0
+    if len(argv) < 3:
+        sys.stderr.write("usage: beads_merge.py BASE OURS THEIRS [...] | bench\n")
+        return 2
+    base_path, left_path, right_path = argv[:3]
+    try:
+        data, field_merges = merge_files(base_path, left_path, right_path)
+    except MergeError as exc:
+        # Leave OURS untouched; git reports the path as conflicted.
+        sys.stderr.write(f"beads merge: {exc}\n")
+        return 1
+    write_atomic(left_path, data)
+    if field_merges:
+        sys.stderr.write(f"beads merge: {field_merges} issue(s) merged field by field\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,366 @@
+"""Incrementally maintained blocker graph for "what is ready to work on".
+
+Beads records dependencies inside each issue::
+
+    "dependencies": [{"issue_id": "a", "depends_on_id": "b", "type": "blocks"}]
+
+meaning ``b`` blocks ``a``.  An issue is *ready* when its status is open or
+in progress and none of its blockers is still open; that is what
+``bd ready`` lists.
+
+:class:`DependencyGraph` interns issue ids to ints and keeps, per node, its
+blockers and dependents, an ``array`` of open-blocker counts and
+``bytearray`` status flags.  :meth:`DependencyGraph.update` applies one
+changed issue in time proportional to its edges, maintaining the ready and
+blocked sets as it goes, so queries never walk the whole graph.  The
+critical path is the one query that needs a full pass; it is computed on
+demand and cached until the next change.
+
+``python3 dep_graph.py bench [N]`` measures build, update and query costs
+on a synthetic N-issue graph (default 100 000).
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from issue_store import OPEN_STATUSES, Issue, IssueStore
+
+BLOCKING_TYPES = frozenset({"blocks"})
+READY_STATUSES = frozenset({"open", "in_progress"})
+
+
+class DependencyGraph:
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._blockers: List[List[int]] = []
+        self._dependents: List[List[int]] = []
+        self._open_blockers = array("i")
+        self._is_open = bytearray()
+        self._is_eligible = bytearray()
+        self._priority = array("b")
+        self._ready: Set[str] = set()
+        self._ready_by_priority: Dict[int, Set[str]] = {}
+        self._blocked: Set[str] = set()
+        self._ready_frozen: Optional[FrozenSet[str]] = None
+        self._blocked_frozen: Optional[FrozenSet[str]] = None
+        self._critical: Optional[List[str]] = None
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[Issue]) -> "DependencyGraph":
+        """Bulk build: flags first, then edges, then one classification
+        pass, instead of an incremental update per issue."""
+        graph = cls()
+        latest = {str(issue["id"]): issue for issue in issues}
+        n = len(latest)
+        graph._ids = list(latest)
+        graph._index = {issue_id: node for node, issue_id in enumerate(graph._ids)}
+        graph._blockers = [[] for _ in range(n)]
+        graph._dependents = [[] for _ in range(n)]
+        graph._open_blockers = array("i", bytes(4 * n))
+        statuses = [issue.get("status") for issue in latest.values()]
+        graph._is_open = bytearray(s in OPEN_STATUSES for s in statuses)
+        graph._is_eligible = bytearray(s in READY_STATUSES for s in statuses)
+        graph._priority = array("b", (_priority(issue) for issue in latest.values()))
+        node_of = graph._node
+        for issue_id, issue in latest.items():
+            node = node_of(issue_id)
+            blockers = {node_of(b) for b in _blocker_ids(issue) if b != issue_id}
+            if not blockers:
+                continue
+            graph._blockers[node] = sorted(blockers)
+            for b in blockers:
+                graph._dependents[b].append(node)
+            graph._open_blockers[node] = sum(graph._is_open[b] for b in blockers)
+        for node in range(len(graph._ids)):
+            graph._classify(node)
+        return graph
+
+    @classmethod
+    def from_store(cls, store: IssueStore) -> "DependencyGraph":
+        store.refresh()
+        return cls.from_issues(store)
+
+    def sync(self, store: IssueStore) -> Set[str]:
+        """Refresh ``store`` and apply only the issues that changed."""
+        changed = store.refresh()
+        for issue_id in changed:
+            issue = store.get(issue_id)
+            if issue is None:
+                self.remove(issue_id)
+            else:
+                self.update(issue)
+        return changed
+
+    # -- mutation ----------------------------------------------------------
+
+    def _node(self, issue_id: str) -> int:
+        node = self._index.get(issue_id)
+        if node is None:
+            # Unknown ids (e.g. blockers not yet loaded) start out closed,
+            # so they do not block anything until they appear.
+            node = self._index[issue_id] = len(self._ids)
+            self._ids.append(issue_id)
+            self._blockers.append([])
+            self._dependents.append([])
+            self._open_blockers.append(0)
+            self._is_open.append(0)
+            self._is_eligible.append(0)
+            self._priority.append(99)
+        return node
+
+    def update(self, issue: Issue) -> None:
+        """Apply the current state of one issue."""
+        node = self._node(str(issue["id"]))
+        status = issue.get("status")
+        priority = _priority(issue)
+        if priority != self._priority[node]:
+            self._unready(node)
+            self._priority[node] = priority
+        self._set_blockers(node, _blocker_ids(issue))
+        self._set_open(node, status in OPEN_STATUSES)
+        self._is_eligible[node] = status in READY_STATUSES
+        self._classify(node)
+        self._critical = None
+
+    def remove(self, issue_id: str) -> None:
+        """Forget an issue's own state; it stops blocking its dependents."""
+        node = self._index.get(issue_id)
+        if node is None:
+            return
+        self._set_blockers(node, [])
+        self._set_open(node, False)
+        self._is_eligible[node] = 0
+        self._classify(node)
+        self._critical = None
+
+    def _set_blockers(self, node: int, blocker_ids: List[str]) -> None:
+        new = {self._node(b) for b in blocker_ids if b != self._ids[node]}
+        old = set(self._blockers[node])
+        if new == old:
+            return
+        for b in old - new:
+            self._dependents[b].remove(node)
+            if self._is_open[b]:
+                self._open_blockers[node] -= 1
+        for b in new - old:
+            self._dependents[b].append(node)
+            if self._is_open[b]:
+                self._open_blockers[node] += 1
+        self._blockers[node] = sorted(new)
+
+    def _set_open(self, node: int, is_open: bool) -> None:
+        if self._is_open[node] == is_open:
+            return
+        self._is_open[node] = is_open
+        delta = 1 if is_open else -1
+        for d in self._dependents[node]:
+            self._open_blockers[d] += delta
+            self._classify(d)
+
+    def _classify(self, node: int) -> None:
+        issue_id = self._ids[node]
+        if self._is_eligible[node] and self._open_blockers[node] == 0:
+            if issue_id not in self._ready:
+                self._ready.add(issue_id)
+                self._ready_by_priority.setdefault(self._priority[node], set()).add(issue_id)
+                self._ready_frozen = None
+            self._unblock(issue_id)
+            return
+        self._unready(node)
+        if self._is_open[node] and self._open_blockers[node] > 0:
+            if issue_id not in self._blocked:
+                self._blocked.add(issue_id)
+                self._blocked_frozen = None
+        else:
+            self._unblock(issue_id)
+
+    def _unblock(self, issue_id: str) -> None:
+        if issue_id in self._blocked:
+            self._blocked.discard(issue_id)
+            self._blocked_frozen = None
+
+    def _unready(self, node: int) -> None:
+        issue_id = self._ids[node]
+        if issue_id in self._ready:
+            self._ready.discard(issue_id)
+            self._ready_by_priority[self._priority[node]].discard(issue_id)
+            self._ready_frozen = None
+
+    # -- queries -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def is_ready(self, issue_id: str) -> bool:
+        return issue_id in self._ready
+
+    def ready(self) -> FrozenSet[str]:
+        """Ids of ready issues; the same object is returned until a change."""
+        if self._ready_frozen is None:
+            self._ready_frozen = frozenset(self._ready)
+        return self._ready_frozen
+
+    def ready_top(self, n: int) -> List[str]:
+        """The ``n`` ready issues with the best priority, ties by id.
+
+        Only the best priority buckets are scanned, so the cost depends on
+        how many ready issues share the top priorities, not on the total.
+        """
+        top: List[str] = []
+        for priority in sorted(self._ready_by_priority):
+            if len(top) >= n:
+                break
+            top.extend(heapq.nsmallest(n - len(top), self._ready_by_priority[priority]))
+        return top
+
+    def blocked(self) -> FrozenSet[str]:
+        """Open issues with at least one open blocker; the same object is
+        returned until a change."""
+        if self._blocked_frozen is None:
+            self._blocked_frozen = frozenset(self._blocked)
+        return self._blocked_frozen
+
+    def open_blockers(self, issue_id: str) -> List[str]:
+        node = self._index.get(issue_id)
+        if node is None:
+            return []
+        return [self._ids[b] for b in self._blockers[node] if self._is_open[b]]
+
+    def critical_path(self) -> List[str]:
+        """Longest chain of open issues linked by open blockers, first
+        blocker first.  Issues on dependency cycles are skipped."""
+        if self._critical is None:
+            self._critical = self._longest_open_chain()
+        return list(self._critical)
+
+    def _longest_open_chain(self) -> List[str]:
+        is_open = self._is_open
+        pending = array("i", (c if is_open[i] else 0 for i, c in enumerate(self._open_blockers)))
+        queue = deque(i for i in range(len(self._ids)) if is_open[i] and pending[i] == 0)
+        depth = array("i", bytes(4 * len(self._ids)))
+        parent = array("i", [-1]) * len(self._ids)
+        best = -1
+        while queue:
+            node = queue.popleft()
+            if best < 0 or depth[node] > depth[best]:
+                best = node
+            for d in self._dependents[node]:
+                if not is_open[d]:
+                    continue
+                if depth[node] + 1 > depth[d]:
+                    depth[d] = depth[node] + 1
+                    parent[d] = node
+                pending[d] -= 1
+                if pending[d] == 0:
+                    queue.append(d)
+        path = []
+        while best >= 0:
+            path.append(self._ids[best])
+            best = parent[best]
+        path.reverse()
+        return path
+
+
+def _priority(issue: Issue) -> int:
+    priority = issue.get("priority")
+    return priority if isinstance(priority, int) and 0 <= priority < 99 else 99
+
+
+def _blocker_ids(issue: Issue) -> List[str]:
+    deps = issue.get("dependencies")
+    if not isinstance(deps, list):
+        return []
+    return [
+        str(dep["depends_on_id"])
+        for dep in deps
+        if isinstance(dep, dict)
+        and dep.get("type", "blocks") in BLOCKING_TYPES
+        and dep.get("depends_on_id")
+    ]
+
+
+# -- benchmark -------------------------------------------------------------
+
+
+def synthetic_issues(n: int, seed: int = 0) -> List[Issue]:
+    """A random DAG: each issue may depend on up to three earlier ones."""
+    rng = random.Random(seed)
+    issues = []
+    for i in range(n):
+        deps = [
+            {"issue_id": f"b-{i}", "depends_on_id": f"b-{rng.randrange(i)}", "type": "blocks"}
+            for _ in range(rng.randint(0, 3) if i else 0)
+        ]
+        issues.append(
+            {
+                "id": f"b-{i}",
+                "status": rng.choice(["open", "open", "in_progress", "closed", "closed"]),
+                "priority": rng.randint(0, 4),
+                "dependencies": deps,
+            }
+        )
+    return issues
+
+
+def bench(n: int = 100_000) -> List[str]:
+    issues = synthetic_issues(n)
+    report = []
+
+    started = time.perf_counter()
+    graph = DependencyGraph.from_issues(issues)
+    report.append(f"build {n} issues: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def per_call_us(fn, repeat: int) -> float:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) / repeat * 1e6
+
+    rng = random.Random(1)
+    targets = [issues[rng.randrange(n)] for _ in range(1000)]
+
+    def toggle_one() -> None:
+        issue = dict(targets[rng.randrange(len(targets))])
+        issue["status"] = "closed" if issue["status"] != "closed" else "open"
+        graph.update(issue)
+
+    report.append(f"update one issue: {per_call_us(toggle_one, 1000):.1f}us")
+    report.append(f"ready() unchanged: {per_call_us(graph.ready, 10000):.2f}us")
+    report.append(f"blocked() unchanged: {per_call_us(graph.blocked, 10000):.2f}us")
+    report.append(f"is_ready(): {per_call_us(lambda: graph.is_ready('b-42'), 10000):.2f}us")
+    report.append(f"ready_top(10): {per_call_us(lambda: graph.ready_top(10), 20) / 1000:.2f}ms")
+
+    def update_then_ready() -> None:
+        toggle_one()
+        graph.ready()
+
+    report.append(f"update + ready(): {per_call_us(update_then_ready, 50) / 1000:.2f}ms")
+    started = time.perf_counter()
+    path = graph.critical_path()
+    report.append(
+        f"critical_path (length {len(path)}): {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+    report.append(f"{len(graph.ready())} ready, {len(graph.blocked())} blocked")
+    return report
+
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["bench"]:
+        n = int(argv[1]) if len(argv) > 1 else 100_000
+        for line in bench(n):
+            print(line)
+        return 0
+    sys.stderr.write("usage: dep_graph.py bench [N]\n")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,186 @@
+"""Persistent, incrementally refreshed listing of non-ignored project files.
+
+The index maps each directory (relative to the project root) to its
+mtime and its non-ignored file and subdirectory names, and is pickled to
+``.claude/tmp/file_index.pickle``.  A refresh walks the directory tree
+again but only ``scandir``s directories whose mtime changed; unchanged
+ones reuse their cached listing, so a warm refresh costs one ``stat`` per
+directory instead of one per file.  Ignored directories are never entered.
+
+A directory's mtime changes when entries are added, removed or renamed,
+which is all a listing depends on.  Edits to ignore files do not touch
+any directory mtime, so the index also records every ignore file it used
+and starts over when one of them changes.
+
+Typical use::
+
+    from file_index import list_files
+
+    for relpath in list_files():
+        ...
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ignore_rules import IMPLICIT_RULES, IgnoreMatcher, parse_lines, root_sources
+from paths import project_root, tmp_dir
+
+INDEX_VERSION = 1
+
+# dir relpath -> (mtime_ns, file names, subdir names, has .gitignore)
+DirEntry = Tuple[int, Tuple[str, ...], Tuple[str, ...], bool]
+
+
+class FileIndex:
+    def __init__(self, root: Optional[Path] = None, cache_path: Optional[Path] = None) -> None:
+        self.root = project_root() if root is None else Path(root)
+        if cache_path is None:
+            cache_path = tmp_dir() / "file_index.pickle"
+        self.cache_path = cache_path
+        self._dirs: Dict[str, DirEntry] = {}
+        self._sources: Dict[str, Tuple[int, int]] = {}
+        self.scanned = 0
+        self._load()
+
+    # -- persistence -------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_path, "rb") as fh:
+                data = pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != str(self.root):
+            return
+        self._dirs = data["dirs"]
+        self._sources = data["sources"]
+
+    def _save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "root": str(self.root),
+            "dirs": self._dirs,
+            "sources": self._sources,
+        }
+        tmp = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_path)
+
+    # -- refresh -------------------------------------------------------------
+
+    def refresh(self) -> int:
+        """Bring the index up to date; returns how many directories were
+        re-listed (0 on a fully warm refresh)."""
+        if not self._sources_unchanged():
+            self._dirs = {}
+        matcher = IgnoreMatcher(parse_lines(IMPLICIT_RULES))
+        sources: Dict[str, Tuple[int, int]] = {}
+        for source in root_sources(self.root):
+            if matcher.add_file(source):
+                sources[str(source)] = _stamp(source)
+
+        old = self._dirs
+        new: Dict[str, DirEntry] = {}
+        self.scanned = 0
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.root, rel) if rel else str(self.root)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            cached = old.get(rel)
+            fresh = cached is not None and cached[0] == mtime
+            if fresh:
+                has_gitignore = cached[3]
+            else:
+                has_gitignore = os.path.isfile(os.path.join(path, ".gitignore"))
+                if rel and cached is not None and cached[3] != has_gitignore:
+                    # A nested .gitignore appeared or vanished; cached
+                    # listings below it were filtered with the old rules.
+                    self._dirs = {}
+                    return self.refresh()
+            if rel and has_gitignore:
+                gitignore = os.path.join(path, ".gitignore")
+                matcher.add_file(gitignore, rel)
+                sources[gitignore] = _stamp(Path(gitignore))
+            if fresh:
+                entry = cached
+            else:
+                entry = self._scan(path, rel, mtime, has_gitignore, matcher)
+                self.scanned += 1
+            new[rel] = entry
+            prefix = f"{rel}/" if rel else ""
+            stack.extend(prefix + name for name in reversed(entry[2]))
+
+        changed = self.scanned > 0 or new.keys() != old.keys() or sources != self._sources
+        self._dirs = new
+        self._sources = sources
+        if changed:
+            self._save()
+        return self.scanned
+
+    def _sources_unchanged(self) -> bool:
+        for source, stamp in self._sources.items():
+            try:
+                if _stamp(Path(source)) != stamp:
+                    return False
+            except FileNotFoundError:
+                return False
+        current = {str(s) for s in root_sources(self.root) if s.is_file()}
+        return current <= self._sources.keys()
+
+    @staticmethod
+    def _scan(
+        path: str, rel: str, mtime: int, has_gitignore: bool, matcher: IgnoreMatcher
+    ) -> DirEntry:
+        files: List[str] = []
+        subdirs: List[str] = []
+        prefix = f"{rel}/" if rel else ""
+        try:
+            entries = list(os.scandir(path))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            entries = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if matcher.matches(prefix + entry.name, is_dir):
+                continue
+            (subdirs if is_dir else files).append(entry.name)
+        return (mtime, tuple(sorted(files)), tuple(sorted(subdirs)), has_gitignore)
+
+    # -- queries -------------------------------------------------------------
+
+    def files(self) -> List[str]:
+        """All non-ignored files as POSIX paths relative to the root."""
+        out: List[str] = []
+        for rel, (_, names, _, _) in self._dirs.items():
+            if rel:
+                out.extend(f"{rel}/{name}" for name in names)
+            else:
+                out.extend(names)
+        return out
+
+    def directories(self) -> List[str]:
+        return [rel for rel in self._dirs if rel]
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def list_files(root: Optional[Path] = None) -> List[str]:
+    """Refresh the persistent index for ``root`` and list its files."""
+    index = FileIndex(root)
+    index.refresh()
+    return index.files()
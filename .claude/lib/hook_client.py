@@ -0,0 +1,219 @@
+"""Thin hook shim that forwards to the hook daemon.
+
+Configure a hook in ``.claude/settings.json`` as::
+
+    .claude/.venv/bin/python .claude/lib/hook_client.py <hook_name>
+
+The shim reads the hook's stdin JSON, sends it to the daemon over a Unix
+socket and replays the reply's stdout, stderr and exit code.  When the
+socket is missing or refuses the connection, the daemon is started in the
+background and this invocation runs the hook in-process instead, so a hook
+never waits on daemon startup.  Once a request has been sent, failures are
+reported rather than retried in-process, since the hook may already have
+run.
+
+This module is on every hook's critical path: keep its imports to the
+standard library's cheapest modules.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from paths import tmp_dir  # noqa: E402
+
+def env_seconds(name: str, default: float) -> float:
+    """Positive number of seconds from the environment, else ``default``.
+
+    Read at import on every hook's path, so a malformed value is reported
+    and ignored rather than raised.
+    """
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        value = 0.0
+    if value > 0:
+        return value
+    sys.stderr.write(f"ignoring {name}={raw!r}: not a positive number of seconds\n")
+    return default
+
+
+CONNECT_TIMEOUT = 0.2
+REPLY_TIMEOUT = env_seconds("CLAUDE_HOOKD_TIMEOUT", 60.0)
+
+# sun_path is 108 bytes on Linux and 104 on macOS, including the NUL.
+_MAX_SOCKET_PATH = 100
+
+
+def socket_path() -> Path:
+    """The daemon's socket: ``.claude/tmp/hookd.sock``, or, when that is too
+    long for ``sun_path``, a per-project name in :func:`private_dir`."""
+    path = tmp_dir() / "hookd.sock"
+    if len(os.fsencode(path)) <= _MAX_SOCKET_PATH:
+        return path
+    import hashlib
+
+    digest = hashlib.sha1(os.fsencode(path)).hexdigest()[:12]
+    return private_dir() / f"{digest}.sock"
+
+
+def private_dir() -> Path:
+    """A directory only the current user can enter.
+
+    ``$XDG_RUNTIME_DIR/claude-hookd`` when available, else
+    ``/tmp/claude-hookd-<uid>``.  The latter is a predictable shared path,
+    so it is checked to be a real directory owned by this user with no
+    group or other access; otherwise ``PermissionError`` is raised and the
+    daemon is not used.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isabs(runtime):
+        path = Path(runtime) / "claude-hookd"
+    else:
+        path = Path("/tmp") / f"claude-hookd-{os.getuid()}"
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    import stat
+
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"refusing to use {path}: not a private directory of this user")
+    return path
+
+
+def pid_path() -> Path:
+    return tmp_dir() / "hookd.pid"
+
+
+def lock_path() -> Path:
+    return tmp_dir() / "hookd.lock"
+
+
+def log_path() -> Path:
+    return tmp_dir() / "hookd.log"
+
+
+def connect() -> socket.socket:
+    """Open a connection to the daemon.
+
+    Raises ``OSError`` when the daemon cannot be reached or its socket
+    belongs to another user; nothing has been sent at that point, so the hook can safely run in-process instead.
+    """
+    path = socket_path()
+    # Whoever owns the socket sees every payload and picks the reply.
+    if os.lstat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path))
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def forward(sock: socket.socket, hook: str, raw_payload: str) -> dict:
+    """Send one request over a connected socket and return the decoded reply.
+
+    Any error raised here may come after the daemon started the hook.
+    """
+    env = {k: v for k, v in os.environ.items() if k.startswith("CLAUDE_")}
+    request = json.dumps({"hook": hook, "payload": raw_payload, "env": env})
+    sock.settimeout(REPLY_TIMEOUT)
+    sock.sendall(request.encode() + b"\n")
+    sock.shutdown(socket.SHUT_WR)
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    if not chunks:
+        raise ConnectionResetError("hook daemon closed the connection")
+    return json.loads(b"".join(chunks))
+
+
+def spawn_daemon() -> None:
+    import subprocess
+
+    daemon = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hook_daemon.py")
+    subprocess.Popen(
+        [sys.executable, daemon, "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def _autostart_enabled() -> bool:
+    return os.environ.get("CLAUDE_HOOKD_AUTOSTART", "1").lower() not in ("0", "false", "no")
+
+
+def main(argv: list) -> int:
+    use_daemon = "--no-daemon" not in argv
+    args = [a for a in argv if a != "--no-daemon"]
+    if len(args) != 1:
+        sys.stderr.write("usage: hook_client.py [--no-daemon] <hook_name>\n")
+        return 1
+    hook = args[0]
+    raw_payload = sys.stdin.read()
+
+    if use_daemon and os.environ.get("CLAUDE_HOOKD_DISABLE") is None:
+        try:
+            sock = connect()
+        except (FileNotFoundError, ConnectionRefusedError):
+            if _autostart_enabled():
+                spawn_daemon()
+        except OSError:
+            # Includes a connect timeout: the daemon never saw the request,
+            # so the in-process path below is safe.
+            pass
+        else:
+            with sock:
+                try:
+                    reply = forward(sock, hook, raw_payload)
+                except socket.timeout:
+                    sys.stderr.write(f"hook daemon timed out running {hook!r}\n")
+                    return 1
+                except (OSError, ValueError) as exc:
+                    # The daemon may already have run the hook; running it
+                    # again here could duplicate its side effects.
+                    sys.stderr.write(f"hook daemon failed running {hook!r}: {exc}\n")
+                    return 1
+            return _emit(
+                reply.get("stdout", ""),
+                reply.get("stderr", ""),
+                int(reply.get("exit_code", 0)),
+            )
+
+    from hook_runtime import emit, run_hook
+
+    return emit(run_hook(hook, raw_payload))
+
+
+def _emit(stdout: str, stderr: str, exit_code: int) -> int:
+    if stdout:
+        sys.stdout.write(stdout)
+        sys.stdout.flush()
+    if stderr:
+        sys.stderr.write(stderr)
+        sys.stderr.flush()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,211 @@
+"""Long-lived hook server, modelled on the beads daemon.
+
+Runtime files live in ``.claude/tmp`` and mirror beads' ``bd.sock`` /
+``daemon.pid`` / ``daemon.lock`` layout:
+
+``hookd.sock``  Unix socket the client shim connects to
+``hookd.pid``   pid of the running daemon
+``hookd.lock``  flock held for the daemon's lifetime; guarantees one daemon
+``hookd.log``   rotating log
+
+Each connection carries one newline-terminated JSON request
+``{"hook": name, "payload": raw_stdin, "env": {...}}`` and receives one JSON
+reply shaped like :class:`hook_runtime.HookResult`.  Requests are handled
+one at a time, so hooks never need to be thread-safe.  The daemon exits
+after ``CLAUDE_HOOKD_IDLE`` seconds (default 900) without a request.
+
+Usage::
+
+    python hook_daemon.py serve|stop|status
+"""
+
+from __future__ import annotations
+
+import errno
+import fcntl
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hook_client import env_seconds, lock_path, log_path, pid_path, socket_path  # noqa: E402
+from hook_runtime import HookResult, run_hook  # noqa: E402
+
+log = logging.getLogger("hookd")
+
+IDLE_TIMEOUT = env_seconds("CLAUDE_HOOKD_IDLE", 900.0)
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 3
+MAX_REQUEST_BYTES = 16 << 20
+
+
+class HookDaemon:
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT) -> None:
+        self.idle_timeout = idle_timeout
+        self.socket_path = socket_path()
+        self._lock_fd: Optional[int] = None
+        self._sock: Optional[socket.socket] = None
+
+    def acquire_lock(self) -> bool:
+        fd = os.open(lock_path(), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as exc:
+            os.close(fd)
+            if exc.errno in (errno.EWOULDBLOCK, errno.EACCES):
+                return False
+            raise
+        self._lock_fd = fd
+        return True
+
+    def serve(self) -> int:
+        if not self.acquire_lock():
+            log.info("another daemon holds %s; exiting", lock_path())
+            return 0
+        try:
+            self._bind()
+            pid_path().write_text(f"{os.getpid()}\n")
+            signal.signal(signal.SIGTERM, self._on_signal)
+            signal.signal(signal.SIGINT, self._on_signal)
+            log.info("listening on %s (pid %d)", self.socket_path, os.getpid())
+            self._loop()
+        finally:
+            self._cleanup()
+        return 0
+
+    def _bind(self) -> None:
+        # Holding the lock means any socket file left behind is stale.
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        sock.listen(16)
+        self._sock = sock
+
+    def _loop(self) -> None:
+        assert self._sock is not None
+        last_request = time.monotonic()
+        while True:
+            remaining = self.idle_timeout - (time.monotonic() - last_request)
+            if remaining <= 0:
+                log.info("idle for %.0fs; shutting down", self.idle_timeout)
+                return
+            readable, _, _ = select.select([self._sock], [], [], remaining)
+            if not readable:
+                continue
+            conn, _ = self._sock.accept()
+            with conn:
+                self._handle(conn)
+            last_request = time.monotonic()
+
+    def _handle(self, conn: socket.socket) -> None:
+        started = time.perf_counter()
+        hook = "?"
+        try:
+            request = json.loads(_read_request(conn))
+            hook = str(request["hook"])
+            result = run_hook(hook, request.get("payload", ""), request.get("env") or None)
+        except Exception as exc:
+            log.exception("bad request")
+            result = HookResult(stderr=f"hook daemon error: {exc}\n", exit_code=1)
+        try:
+            conn.sendall(json.dumps(result.to_dict()).encode())
+        except OSError:
+            log.warning("client for %s went away before the reply", hook)
+        log.info(
+            "%s exit=%d %.1fms", hook, result.exit_code, (time.perf_counter() - started) * 1000
+        )
+
+    def _on_signal(self, signum, frame) -> None:
+        # Unwinds through serve()'s ``finally`` so runtime files are removed.
+        raise SystemExit(0)
+
+    def _cleanup(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        for path in (self.socket_path, pid_path()):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+def _read_request(conn: socket.socket) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b"\n"):
+            break
+        if size > MAX_REQUEST_BYTES:
+            raise ValueError("request too large")
+    return b"".join(chunks)
+
+
+def running_pid() -> Optional[int]:
+    """Pid of the live daemon, or ``None`` if none is running."""
+    try:
+        pid = int(pid_path().read_text().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    return pid
+
+
+def configure_logging() -> None:
+    import logging.handlers
+
+    handler = logging.handlers.RotatingFileHandler(
+        log_path(), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def main(argv: list) -> int:
+    command = argv[0] if argv else "serve"
+    if command == "serve":
+        configure_logging()
+        return HookDaemon().serve()
+    if command == "status":
+        pid = running_pid()
+        print(f"running (pid {pid})" if pid else "not running")
+        return 0 if pid else 1
+    if command == "stop":
+        pid = running_pid()
+        if pid:
+            os.kill(pid, signal.SIGTERM)
+        return 0
+    sys.stderr.write("usage: hook_daemon.py serve|stop|status\n")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
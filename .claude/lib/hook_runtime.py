@@ -0,0 +1,157 @@
+"""In-process execution of hook entry points.
+
+A hook is a module in ``.claude/hooks`` exposing ``run(payload)``, where
+``payload`` is the JSON object Claude Code writes to the hook's stdin.
+``run`` may return a :class:`HookResult`, a ``dict`` (emitted as JSON on
+stdout), a ``str`` (emitted verbatim) or ``None``.
+
+The same code path serves the hook daemon and the client's fallback, so a
+hook behaves identically whether or not the daemon is up.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+import os
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from types import ModuleType
+from typing import Dict, Optional, Tuple
+
+from lazy import lazy_import
+from paths import hooks_dir
+from tracing import configure_from_env, maybe_flush, restore, set_context, span
+
+# Only needed when a hook raises.
+traceback = lazy_import("traceback")
+
+
+class HookResult:
+    # A plain class rather than a dataclass: ``dataclasses`` imports
+    # ``inspect``, which costs several milliseconds on every cold start.
+    __slots__ = ("stdout", "stderr", "exit_code")
+
+    def __init__(self, stdout: str = "", stderr: str = "", exit_code: int = 0) -> None:
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+
+    def __repr__(self) -> str:
+        return f"HookResult(stdout={self.stdout!r}, stderr={self.stderr!r}, exit_code={self.exit_code})"
+
+    def to_dict(self) -> dict:
+        return {"stdout": self.stdout, "stderr": self.stderr, "exit_code": self.exit_code}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HookResult":
+        return cls(
+            stdout=str(data.get("stdout", "")),
+            stderr=str(data.get("stderr", "")),
+            exit_code=int(data.get("exit_code", 0)),
+        )
+
+
+_modules: Dict[str, Tuple[int, ModuleType]] = {}
+_modules_lock = threading.Lock()
+
+
+def load_hook(name: str) -> ModuleType:
+    """Import ``.claude/hooks/<name>.py``, re-importing it when it changes."""
+    if not name.isidentifier():
+        raise ValueError(f"invalid hook name: {name!r}")
+    path = hooks_dir() / f"{name}.py"
+    mtime = os.stat(path).st_mtime_ns
+    with _modules_lock:
+        cached = _modules.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        spec = importlib.util.spec_from_file_location(f"claude_hooks.{name}", path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"cannot load hook {name!r} from {path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[name] = (mtime, module)
+        return module
+
+
+def run_hook(name: str, raw_payload: str, env: Optional[Dict[str, str]] = None) -> HookResult:
+    """Run hook ``name`` against the raw stdin text it would have received.
+
+    ``env`` overlays ``os.environ`` for the duration of the call; the daemon
+    uses it to present each request with its client's ``CLAUDE_*`` variables.
+    Anything the hook prints is captured into the result, and ``SystemExit``
+    becomes the result's exit code, so neither escapes into the daemon.
+    """
+    saved = _apply_env(env) if env else None
+    # Tracing flags may differ between the daemon and this client.
+    trace_settings = configure_from_env() if env else None
+    out, err = io.StringIO(), io.StringIO()
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            payload = json.loads(raw_payload) if raw_payload.strip() else {}
+            session = payload.get("session_id") if isinstance(payload, dict) else None
+            set_context(name, str(session or ""))
+            with span("hook"):
+                result = _coerce(load_hook(name).run(payload))
+    except SystemExit as exc:
+        result = _exit_result(exc.code)
+    except Exception:
+        result = HookResult(stderr=traceback.format_exc(), exit_code=1)
+    finally:
+        maybe_flush()
+        if trace_settings is not None:
+            restore(trace_settings)
+        if saved is not None:
+            _restore_env(saved)
+    printed, warned = out.getvalue(), err.getvalue()
+    if not (printed or warned):
+        return result
+    # A new object: the hook may hand back a HookResult it reuses.
+    return HookResult(printed + result.stdout, warned + result.stderr, result.exit_code)
+
+
+def _exit_result(code: object) -> HookResult:
+    # Mirrors how the interpreter turns sys.exit() arguments into a status.
+    if code is None:
+        return HookResult()
+    if isinstance(code, int):
+        return HookResult(exit_code=code)
+    return HookResult(stderr=f"{code}\n", exit_code=1)
+
+
+def _coerce(result: object) -> HookResult:
+    if isinstance(result, HookResult):
+        return result
+    if result is None:
+        return HookResult()
+    if isinstance(result, str):
+        return HookResult(stdout=result)
+    return HookResult(stdout=json.dumps(result))
+
+
+def _apply_env(env: Dict[str, str]) -> Dict[str, Optional[str]]:
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    return saved
+
+
+def _restore_env(saved: Dict[str, Optional[str]]) -> None:
+    for key, value in saved.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def emit(result: HookResult) -> int:
+    """Write a result to the real stdio and return the process exit code."""
+    if result.stdout:
+        sys.stdout.write(result.stdout)
+        sys.stdout.flush()
+    if result.stderr:
+        sys.stderr.write(result.stderr)
+        sys.stderr.flush()
+    return result.exit_code
@@ -0,0 +1,246 @@
+"""Multi-repo issue hydration (beads' experimental ``repos`` mode).
+
+``.beads/config.yaml`` can name additional repositories to hydrate from::
+
+    repos:
+      primary: "."
+      additional:
+        - ~/beads-planning
+
+:func:`hydrate` loads every repository's ``issues.jsonl`` concurrently and
+returns a :class:`HydratedIndex`: one read-only view over all issues that
+remembers which JSONL each issue came from, so writes can be routed back
+to the right file.
+
+The primary repository goes through :func:`issue_store.load_store`, which
+refreshes incrementally.  Additional repositories are cached on disk under
+``.claude/tmp/hydrate``; a cache entry is reused when the file's size,
+mtime and inode are unchanged, and otherwise when its SHA-256 still
+matches, so a warm start only parses files whose content really changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from beads_config import load_config
+from issue_store import Issue, load_store, record_issue
+from paths import project_root, tmp_dir
+
+CACHE_VERSION = 1
+MAX_WORKERS = 8
+
+# How an additional repository was loaded, reported in ``load_stats``.
+STAT_HIT = "stat"
+HASH_HIT = "hash"
+PARSED = "parsed"
+MISSING = "missing"
+
+
+def configured_repos(config: Optional[Mapping] = None) -> Tuple[Path, List[Path]]:
+    """Primary repo root and additional repo roots from the beads config."""
+    config = load_config() if config is None else config
+    repos = config.get("repos")
+    if not isinstance(repos, Mapping):
+        repos = {}
+    root = project_root()
+    primary = _resolve(repos.get("primary") or ".", root)
+    listed = repos.get("additional") or []
+    if isinstance(listed, str):
+        # "additional: ~/x" names one repository, not a list of characters.
+        listed = [listed]
+    additional = [_resolve(p, root) for p in listed if p]
+    return primary, [p for p in additional if p != primary]
+
+
+def _resolve(path: str, root: Path) -> Path:
+    resolved = Path(os.path.expanduser(str(path)))
+    if not resolved.is_absolute():
+        resolved = root / resolved
+    return resolved.resolve()
+
+
+def jsonl_for(repo: Path) -> Path:
+    return repo / ".beads" / "issues.jsonl"
+
+
+# -- per-repo loading ----------------------------------------------------
+
+
+def _cache_path(jsonl: Path) -> Path:
+    digest = hashlib.sha1(os.fsencode(jsonl)).hexdigest()[:16]
+    path = tmp_dir() / "hydrate"
+    path.mkdir(exist_ok=True)
+    return path / f"{digest}.pickle"
+
+
+def _read_cache(path: Path) -> Optional[dict]:
+    try:
+        with open(path, "rb") as fh:
+            entry = pickle.load(fh)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _write_cache(path: Path, entry: dict) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as fh:
+        pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _parse(data: bytes) -> Dict[str, Issue]:
+    issues: Dict[str, Issue] = {}
+    for raw in data.splitlines():
+        if not raw.strip():
+            continue
+        try:
+            issue = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(issue, dict) and isinstance(issue.get("id"), str):
+            issues[issue["id"]] = issue
+    return issues
+
+
+# Entries already loaded by this process (e.g. the hook daemon), so that
+# repeated hydration skips even the unpickling.
+_loaded: Dict[Path, dict] = {}
+
+
+def load_repo(jsonl: Path) -> Tuple[Dict[str, Issue], str]:
+    """Issues in one additional repository and how they were obtained."""
+    try:
+        st = os.stat(jsonl)
+    except FileNotFoundError:
+        _loaded.pop(jsonl, None)
+        return {}, MISSING
+    stamp = (st.st_size, st.st_mtime_ns, st.st_ino)
+    entry = _loaded.get(jsonl)
+    if entry is not None and entry["stamp"] == stamp:
+        return entry["issues"], STAT_HIT
+    cache_path = _cache_path(jsonl)
+    entry = _read_cache(cache_path)
+    if entry is not None and entry["stamp"] == stamp:
+        _loaded[jsonl] = entry
+        return entry["issues"], STAT_HIT
+
+    with open(jsonl, "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if entry is not None and entry["sha256"] == digest:
+        entry["stamp"] = stamp
+        _write_cache(cache_path, entry)
+        _loaded[jsonl] = entry
+        return entry["issues"], HASH_HIT
+
+    issues = _parse(data)
+    entry = {"version": CACHE_VERSION, "stamp": stamp, "sha256": digest, "issues": issues}
+    _write_cache(cache_path, entry)
+    _loaded[jsonl] = entry
+    return issues, PARSED
+
+
+# -- merged index ----------------------------------------------------------
+
+
+class HydratedIndex:
+    """Read-only view over issues from several repositories.
+
+    When an id appears in more than one repository the primary wins, then
+    additional repositories in config order.  Issue dicts are shared with
+    the underlying caches and must not be mutated; write through
+    :meth:`record` instead.
+    """
+
+    def __init__(
+        self,
+        primary: Path,
+        sources: Sequence[Tuple[Path, Mapping[str, Issue]]],
+        load_stats: Optional[Dict[Path, str]] = None,
+    ) -> None:
+        self.primary = primary
+        self.repos = [repo for repo, _ in sources]
+        self.load_stats = load_stats or {}
+        issues: Dict[str, Issue] = {}
+        routes: Dict[str, Path] = {}
+        prefixes: Dict[str, Path] = {}
+        for repo, repo_issues in reversed(sources):
+            jsonl = jsonl_for(repo)
+            issues.update(repo_issues)
+            routes.update(dict.fromkeys(repo_issues, jsonl))
+            prefixes.update({_prefix(i): jsonl for i in repo_issues})
+        by_status: Dict[object, List[str]] = {}
+        for issue_id, issue in issues.items():
+            by_status.setdefault(issue.get("status"), []).append(issue_id)
+        self.issues: Mapping[str, Issue] = MappingProxyType(issues)
+        self._routes = routes
+        self._prefixes = prefixes
+        self._by_status = by_status
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+    def __contains__(self, issue_id: object) -> bool:
+        return issue_id in self.issues
+
+    def get(self, issue_id: str) -> Optional[Issue]:
+        return self.issues.get(issue_id)
+
+    def by_status(self, status: str) -> List[Issue]:
+        return [self.issues[i] for i in self._by_status.get(status, ())]
+
+    def source_of(self, issue_id: str) -> Optional[Path]:
+        """The JSONL file an existing issue was loaded from."""
+        return self._routes.get(issue_id)
+
+    def write_path(self, issue: Issue) -> Path:
+        """Where a record for ``issue`` belongs.
+
+        Existing issues go back to their source; new ones go to the
+        repository that already uses their id prefix, else the primary.
+        """
+        issue_id = str(issue["id"])
+        return (
+            self._routes.get(issue_id)
+            or self._prefixes.get(_prefix(issue_id))
+            or jsonl_for(self.primary)
+        )
+
+    def record(self, issue: Issue) -> Path:
+        """Queue ``issue`` for appending to its routed JSONL; return that path."""
+        path = self.write_path(issue)
+        record_issue(issue, path)
+        return path
+
+
+def _prefix(issue_id: str) -> str:
+    return issue_id.rsplit("-", 1)[0]
+
+
+def hydrate(config: Optional[Mapping] = None) -> HydratedIndex:
+    """Load the primary and all additional repositories into one index."""
+    primary, additional = configured_repos(config)
+    load_stats: Dict[Path, str] = {}
+    sources: List[Tuple[Path, Mapping[str, Issue]]] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(additional)))) as pool:
+        futures = [pool.submit(load_repo, jsonl_for(repo)) for repo in additional]
+        # The primary refreshes on this thread while the pool works.
+        store = load_store(jsonl_for(primary))
+        sources.append((primary, {issue["id"]: issue for issue in store}))
+        for repo, future in zip(additional, futures):
+            issues, how = future.result()
+            sources.append((repo, issues))
+            load_stats[repo] = how
+    return HydratedIndex(primary, sources, load_stats)
@@ -0,0 +1,244 @@
+"""Gitignore-style pattern matching for ``.gitignore`` and ``.claudeignore``.
+
+All rules from all sources are translated to regular expressions and
+folded into one alternation per entry kind (file or directory), so testing
+a path is a single ``re`` match in the common case where nothing ignores
+it.  Only when a negated rule (``!pattern``) exists and the path matched a
+positive rule is the rule list evaluated in order, last match winning, as
+git does.
+
+Matching is meant to be used top-down: callers walking a tree test each
+entry with :meth:`IgnoreMatcher.matches` and never descend into ignored
+directories, which is also why, as in git, a file cannot be re-included
+once its parent directory is excluded.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from paths import project_root
+
+log = logging.getLogger(__name__)
+
+# git never looks inside its own directory, whatever the rules say.
+IMPLICIT_RULES = (".git/",)
+
+
+class Rule(NamedTuple):
+    pattern: str
+    regex: "re.Pattern[str]"
+    negated: bool
+    dir_only: bool
+
+
+def translate(pattern: str) -> str:
+    """Regex source for a gitignore glob, matched against a full relative
+    POSIX path (without leading or trailing slash)."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                before_ok = i == 0 or pattern[i - 1] == "/"
+                after = pattern[i + 2:i + 3]
+                if before_ok and after == "/":
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if before_ok and after == "":
+                    out.append(".*")
+                    i += 2
+                    continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            bracket = _bracket(pattern, i)
+            if bracket is None:
+                out.append(re.escape(c))
+            else:
+                cls, i = bracket
+                out.append(cls)
+                continue
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    body = "".join(out)
+    return body if anchored else "(?:.*/)?" + body
+
+
+_POSIX_CLASSES = {
+    "alnum": "a-zA-Z0-9",
+    "alpha": "a-zA-Z",
+    "blank": " \\t",
+    "cntrl": "\\x00-\\x1f\\x7f",
+    "digit": "0-9",
+    "graph": "!-~",
+    "lower": "a-z",
+    "print": " -~",
+    "punct": re.escape("!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"),
+    "space": " \\t\\n\\r\\f\\v",
+    "upper": "A-Z",
+    "xdigit": "0-9A-Fa-f",
+}
+
+
+def _bracket(pattern: str, i: int) -> Optional[Tuple[str, int]]:
+    """Translate the bracket expression at ``pattern[i]`` (a ``[``).
+
+    Returns the regex class and the index just past the closing ``]``, or
+    None when the bracket is unterminated and so a literal ``[``.  As in
+    git, ``]`` right after ``[`` or ``[!`` is a literal, POSIX classes
+    such as ``[:digit:]`` are supported, and a class never matches ``/``.
+    Raises ``ValueError`` for an unknown POSIX class.
+    """
+    j = i + 1
+    negated = pattern[j:j + 1] in ("!", "^")
+    if negated:
+        j += 1
+    parts = []
+    first = True
+    while j < len(pattern):
+        c = pattern[j]
+        if c == "]" and not first:
+            if negated:
+                return "[^/" + "".join(parts) + "]", j + 1
+            return "(?!/)[" + "".join(parts) + "]", j + 1
+        first = False
+        if pattern.startswith("[:", j):
+            end = pattern.find(":]", j + 2)
+            if end != -1:
+                name = pattern[j + 2:end]
+                if name not in _POSIX_CLASSES:
+                    raise ValueError(f"unknown character class [:{name}:]")
+                parts.append(_POSIX_CLASSES[name])
+                j = end + 2
+                continue
+        if c == "\\" and j + 1 < len(pattern):
+            j += 1
+            c = pattern[j]
+            parts.append("\\" + c if c in "\\]^[-" else c)
+        else:
+            # "-" stays unescaped: ranges mean the same in both syntaxes.
+            parts.append("\\" + c if c in "\\]^[" else c)
+        j += 1
+    return None
+
+
+def parse_lines(lines: Iterable[str], base: str = "") -> List[Rule]:
+    """Rules from ignore-file lines; ``base`` is the file's directory
+    relative to the project root ("" for the root)."""
+    rules = []
+    prefix = re.escape(base.strip("/") + "/") if base.strip("/") else ""
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        try:
+            regex = re.compile(prefix + translate(line) + r"\Z", re.DOTALL)
+        except (re.error, ValueError) as exc:
+            log.warning("ignoring invalid pattern %r: %s", line, exc)
+            continue
+        rules.append(Rule(line, regex, negated, dir_only))
+    return rules
+
+
+class IgnoreMatcher:
+    def __init__(self, rules: Sequence[Rule] = ()) -> None:
+        self._rules: List[Rule] = []
+        self._any_file: Optional[re.Pattern] = None
+        self._any_dir: Optional[re.Pattern] = None
+        self._has_negation = False
+        self.extend(rules)
+
+    def extend(self, rules: Iterable[Rule]) -> None:
+        self._rules.extend(rules)
+        self._has_negation = any(r.negated for r in self._rules)
+        self._any_file = self._any_dir = None
+
+    def add_file(self, path: os.PathLike, base: str = "") -> bool:
+        """Add rules from an ignore file; returns False if it is missing."""
+        try:
+            text = Path(path).read_text(errors="replace")
+        except (FileNotFoundError, NotADirectoryError):
+            return False
+        self.extend(parse_lines(text.splitlines(), base))
+        return True
+
+    def _union(self, is_dir: bool) -> re.Pattern:
+        sources = [
+            r.regex.pattern for r in self._rules if not r.negated and (is_dir or not r.dir_only)
+        ]
+        # "(?!)" never matches; it keeps the union valid when empty.
+        return re.compile("|".join(f"(?:{s})" for s in sources) or "(?!)", re.DOTALL)
+
+    def matches(self, relpath: str, is_dir: bool = False) -> bool:
+        """Whether this entry itself is ignored (ancestors not considered)."""
+        if is_dir:
+            if self._any_dir is None:
+                self._any_dir = self._union(True)
+            union = self._any_dir
+        else:
+            if self._any_file is None:
+                self._any_file = self._union(False)
+            union = self._any_file
+        if union.match(relpath) is None:
+            return False
+        if not self._has_negation:
+            return True
+        for rule in reversed(self._rules):
+            if (is_dir or not rule.dir_only) and rule.regex.match(relpath):
+                return not rule.negated
+        return False
+
+    def is_ignored(self, relpath: str, is_dir: bool = False) -> bool:
+        """Whether a path is ignored, itself or through a parent directory."""
+        parts = relpath.strip("/").split("/")
+        for depth in range(1, len(parts)):
+            if self.matches("/".join(parts[:depth]), True):
+                return True
+        return self.matches("/".join(parts), is_dir)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+def root_sources(root: Optional[Path] = None) -> List[Path]:
+    """Ignore files that apply to the whole project, lowest precedence first."""
+    root = project_root() if root is None else root
+    return [root / ".git" / "info" / "exclude", root / ".gitignore", root / ".claudeignore"]
+
+
+def project_matcher(root: Optional[Path] = None) -> IgnoreMatcher:
+    """Matcher for the project's root-level ignore sources.
+
+    Nested ``.gitignore`` files are picked up by :mod:`file_index` as it
+    walks into their directories.
+    """
+    matcher = IgnoreMatcher(parse_lines(IMPLICIT_RULES))
+    for source in root_sources(root):
+        matcher.add_file(source)
+    return matcher
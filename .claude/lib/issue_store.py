@@ -0,0 +1,300 @@
+"""Indexed, incrementally reloaded view of ``.beads/issues.jsonl``.
+
+The JSONL export is the only issue data guaranteed to exist in a fresh
+clone (``beads.db`` is gitignored), so hooks read it directly.  Parsing the
+whole file on every prompt is wasteful; :class:`IssueStore` parses it once,
+keeps indexes by id, status, priority and issue type, and on later
+refreshes only parses bytes appended since the last read.  A full rebuild
+happens when the file is replaced (new inode), truncated, or rewritten in
+place.
+
+Typical hook usage::
+
+    from issue_store import load_store
+
+    store = load_store()
+    for issue in store.by_status("in_progress"):
+        ...
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+from paths import issues_jsonl
+
+if TYPE_CHECKING:
+    from write_batch import AppendBuffer
+
+log = logging.getLogger(__name__)
+
+# Bytes before the last read offset that are re-checked on an incremental
+# refresh, to catch in-place rewrites that happen to grow the file.
+_FINGERPRINT_BYTES = 64
+
+OPEN_STATUSES = frozenset({"open", "in_progress", "blocked"})
+
+Issue = Dict[str, object]
+
+
+class IssueStore:
+    """In-memory issue indexes over a beads JSONL export."""
+
+    def __init__(self, path: Optional[os.PathLike] = None) -> None:
+        self.path = Path(path) if path is not None else issues_jsonl()
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Issue] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        self._by_priority: Dict[object, Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = {}
+        self._identity: Optional[Tuple[int, int]] = None
+        self._mtime_ns = 0
+        self._offset = 0
+        self._fingerprint = b""
+
+    # -- loading ---------------------------------------------------------
+
+    def refresh(self) -> Set[str]:
+        """Bring the indexes up to date with the file.
+
+        Returns the ids whose record was added, changed or dropped, so
+        callers maintaining derived state can update incrementally.  An
+        empty set means nothing changed.
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return self._reset()
+
+            identity = (st.st_dev, st.st_ino)
+            if identity != self._identity or st.st_size < self._offset:
+                return self._rebuild()
+            if st.st_size == self._offset:
+                if st.st_mtime_ns != self._mtime_ns:
+                    return self._rebuild()
+                return set()
+
+            with open(self.path, "rb") as fh:
+                start = max(0, self._offset - len(self._fingerprint))
+                fh.seek(start)
+                if fh.read(self._offset - start) != self._fingerprint:
+                    return self._rebuild()
+                changed = self._consume(fh)
+            self._mtime_ns = st.st_mtime_ns
+            if changed:
+                self.generation += 1
+            return changed
+
+    def _reset(self) -> Set[str]:
+        changed = set(self._by_id)
+        self._by_id.clear()
+        self._by_status.clear()
+        self._by_priority.clear()
+        self._by_type.clear()
+        self._identity = None
+        self._mtime_ns = 0
+        self._offset = 0
+        self._fingerprint = b""
+        if changed:
+            self.generation += 1
+        return changed
+
+    def _rebuild(self) -> Set[str]:
+        changed = self._reset()
+        try:
+            fh = open(self.path, "rb")
+        except FileNotFoundError:
+            return changed
+        with fh:
+            st = os.fstat(fh.fileno())
+            self._identity = (st.st_dev, st.st_ino)
+            self._mtime_ns = st.st_mtime_ns
+            changed |= self._consume(fh)
+        self.generation += 1
+        return changed
+
+    def _consume(self, fh) -> Set[str]:
+        """Parse complete lines from ``self._offset`` to EOF.
+
+        A trailing line without a newline is left for the next refresh:
+        it is most likely a write still in progress.
+        """
+        fh.seek(self._offset)
+        data = fh.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return set()
+
+        changed: Set[str] = set()
+        for raw in data[:end].splitlines():
+            if not raw.strip():
+                continue
+            try:
+                issue = json.loads(raw)
+            except ValueError:
+                log.debug("skipping malformed line in %s", self.path)
+                continue
+            issue_id = issue.get("id") if isinstance(issue, dict) else None
+            if not isinstance(issue_id, str):
+                continue
+            if not _indexable(issue):
+                log.debug("skipping unindexable record %s in %s", issue_id, self.path)
+                continue
+            self._upsert(issue_id, issue)
+            changed.add(issue_id)
+
+        self._offset += end
+        self._fingerprint = data[max(0, end - _FINGERPRINT_BYTES):end]
+        return changed
+
+    def _upsert(self, issue_id: str, issue: Issue) -> None:
+        old = self._by_id.get(issue_id)
+        if old is not None:
+            _discard(self._by_status, old.get("status"), issue_id)
+            _discard(self._by_priority, old.get("priority"), issue_id)
+            _discard(self._by_type, old.get("issue_type"), issue_id)
+        self._by_id[issue_id] = issue
+        self._by_status.setdefault(issue.get("status"), set()).add(issue_id)
+        self._by_priority.setdefault(issue.get("priority"), set()).add(issue_id)
+        self._by_type.setdefault(issue.get("issue_type"), set()).add(issue_id)
+
+    # -- queries ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, issue_id: object) -> bool:
+        return issue_id in self._by_id
+
+    def __iter__(self) -> Iterator[Issue]:
+        return iter(list(self._by_id.values()))
+
+    def get(self, issue_id: str) -> Optional[Issue]:
+        return self._by_id.get(issue_id)
+
+    def by_status(self, status: str) -> List[Issue]:
+        return self._select(self._by_status.get(status))
+
+    def by_priority(self, priority: int) -> List[Issue]:
+        return self._select(self._by_priority.get(priority))
+
+    def by_type(self, issue_type: str) -> List[Issue]:
+        return self._select(self._by_type.get(issue_type))
+
+    def open_issues(self) -> List[Issue]:
+        """Issues that are not closed: open, in progress or blocked."""
+        ids: Set[str] = set()
+        for status in OPEN_STATUSES:
+            ids |= self._by_status.get(status, set())
+        return self._select(ids)
+
+    def counts_by_status(self) -> Dict[str, int]:
+        return {s: len(ids) for s, ids in self._by_status.items() if ids}
+
+    def _select(self, ids: Optional[Set[str]]) -> List[Issue]:
+        if not ids:
+            return []
+        by_id = self._by_id
+        return sorted(
+            (by_id[i] for i in ids),
+            key=lambda issue: (_priority_key(issue), issue["id"]),
+        )
+
+
+def _discard(index: Dict[object, Set[str]], key: object, issue_id: str) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(issue_id)
+        if not ids:
+            del index[key]
+
+
+def _indexable(issue: Issue) -> bool:
+    try:
+        hash((issue.get("status"), issue.get("priority"), issue.get("issue_type")))
+    except TypeError:
+        return False
+    return True
+
+
+def _priority_key(issue: Issue) -> int:
+    priority = issue.get("priority")
+    return priority if isinstance(priority, int) else 99
+
+
+_stores: Dict[Path, IssueStore] = {}
+_stores_lock = threading.Lock()
+
+
+def load_store(path: Optional[os.PathLike] = None) -> IssueStore:
+    """Return the process-wide store for ``path``, refreshed.
+
+    Repeated calls in a long-lived process only pay for appended bytes.
+    """
+    key = Path(path) if path is not None else issues_jsonl()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = IssueStore(key)
+        writer = _writers.get(key)
+    if writer is not None:
+        # Let callers see their own record_issue() calls immediately.
+        writer.flush()
+    store.refresh()
+    return store
+
+
+_writers: Dict[Path, "AppendBuffer"] = {}
+
+
+def issue_writer(path: Optional[os.PathLike] = None) -> "AppendBuffer":
+    """Shared append buffer for an issues JSONL file.
+
+    Flushing follows beads' ``flush-debounce`` / ``no-auto-flush`` settings
+    and always happens at interpreter exit.
+    """
+    from write_batch import AppendBuffer
+
+    key = Path(path) if path is not None else issues_jsonl()
+    with _stores_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = AppendBuffer(key)
+    return writer
+
+
+def record_issue(issue: Issue, path: Optional[os.PathLike] = None) -> None:
+    """Queue a new or updated issue record for appending.
+
+    Appending instead of rewriting keeps each mutation O(1) and lets
+    :class:`IssueStore` reload incrementally; readers, including
+    :class:`IssueStore` and the merge driver, take the last record for an
+    id.
+    :func:`load_store` flushes first, so a process always sees its own
+    records.  Superseded lines stay until :func:`compact_issues` runs.
+    """
+    if not isinstance(issue.get("id"), str):
+        raise ValueError("issue record needs a string 'id'")
+    issue_writer(path).append(issue)
+
+
+def compact_issues(path: Optional[os.PathLike] = None) -> int:
+    """Flush pending records, then drop superseded lines from the file.
+
+    A full rewrite: every :class:`IssueStore` on the file rebuilds on its
+    next refresh.  Returns the number of lines dropped.
+    """
+    from write_batch import compact_jsonl
+
+    key = Path(path) if path is not None else issues_jsonl()
+    writer = _writers.get(key)
+    if writer is not None:
+        writer.flush()
+    return compact_jsonl(key)
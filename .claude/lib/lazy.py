@@ -0,0 +1,27 @@
+"""Deferred module imports for hook code paths.
+
+``lazy_import("yaml")`` returns a module object whose import runs on first
+attribute access, so a dependency used by one branch of a hook is only paid
+for when that branch executes.  Missing modules still fail at
+``lazy_import`` time, not deep inside a hook.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
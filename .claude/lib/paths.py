@@ -0,0 +1,53 @@
+"""Project path resolution shared by hooks and library modules.
+
+Hooks run with an arbitrary working directory, so everything is resolved
+from ``CLAUDE_PROJECT_DIR`` when Claude Code provides it, falling back to
+the repository that contains this file.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+_LIB_DIR = Path(__file__).resolve().parent
+
+
+def project_root() -> Path:
+    """Return the repository root (the directory holding ``.claude``)."""
+    env = os.environ.get("CLAUDE_PROJECT_DIR")
+    if env:
+        return Path(env)
+    return _LIB_DIR.parent.parent
+
+
+def claude_dir() -> Path:
+    return project_root() / ".claude"
+
+
+def beads_dir() -> Path:
+    return project_root() / ".beads"
+
+
+def issues_jsonl() -> Path:
+    return beads_dir() / "issues.jsonl"
+
+
+def hooks_dir() -> Path:
+    return claude_dir() / "hooks"
+
+
+def session_dir(session_id: str = "") -> Path:
+    """``.claude/session``, or the per-session directory inside it."""
+    path = claude_dir() / "session"
+    if session_id:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in session_id)
+        path = path / safe.lstrip(".")
+    return path
+
+
+def tmp_dir() -> Path:
+    """Scratch space for runtime files; created on first use."""
+    path = claude_dir() / "tmp"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,200 @@
+"""Bounded-memory readers for session JSONL files.
+
+Session transcripts grow for the life of a session and can reach hundreds
+of megabytes, so nothing here loads a whole file.  Three access patterns
+are covered:
+
+* :func:`iter_events` -- oldest first, one line at a time;
+* :func:`iter_events_reverse` / :func:`tail` -- newest first, reading
+  fixed-size blocks backwards from the end, so the cost is proportional to
+  how far back the caller reads rather than to the session length;
+* :class:`SessionCursor` -- resumes where the previous hook invocation
+  stopped, with the offset persisted under ``.claude/session/<id>/``.
+
+All readers accept ``types`` to keep only events whose ``"type"`` is in
+the given set.  A final line without a newline is treated as a write in
+progress and skipped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional
+
+from paths import session_dir
+
+BLOCK_SIZE = 64 * 1024
+
+Event = Dict[str, object]
+
+
+def iter_events(
+    path: os.PathLike, types: Optional[Collection[str]] = None, start: int = 0
+) -> Iterator[Event]:
+    """Yield events from byte offset ``start`` to the end, oldest first."""
+    for _, event in _iter_from(path, start, types):
+        if event is not None:
+            yield event
+
+
+def iter_events_reverse(
+    path: os.PathLike,
+    types: Optional[Collection[str]] = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[Event]:
+    """Yield events newest first, reading the file backwards in blocks."""
+    needles = _needles(types)
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with fh:
+        pos = fh.seek(0, os.SEEK_END)
+        carry = b""
+        seen_newline = False
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            fh.seek(pos)
+            block = fh.read(step) + carry
+            if not seen_newline:
+                # Bytes after the last newline belong to an unfinished write.
+                cut = block.rfind(b"\n")
+                if cut == -1:
+                    carry = b""
+                    continue
+                block = block[:cut]
+                seen_newline = True
+            lines = block.split(b"\n")
+            # lines[0] may continue in the previous block; keep it for later.
+            carry = lines[0]
+            for raw in reversed(lines[1:]):
+                event = _decode(raw, types, needles)
+                if event is not None:
+                    yield event
+        if seen_newline:
+            event = _decode(carry, types, needles)
+            if event is not None:
+                yield event
+
+
+def tail(
+    path: os.PathLike, n: int, types: Optional[Collection[str]] = None
+) -> List[Event]:
+    """The last ``n`` matching events, in chronological order."""
+    events: List[Event] = []
+    if n <= 0:
+        return events
+    for event in iter_events_reverse(path, types):
+        events.append(event)
+        if len(events) == n:
+            break
+    events.reverse()
+    return events
+
+
+def session_file(session_id: str, name: str = "events.jsonl") -> Path:
+    return session_dir(session_id) / name
+
+
+class SessionCursor:
+    """Resumable read position in a session file.
+
+    Each named cursor remembers the byte offset and inode of the file it
+    last read, so a hook that runs on every turn only parses what was
+    appended since its previous run.  If the file was replaced or
+    truncated, reading restarts from the beginning.
+    """
+
+    def __init__(self, session_id: str, name: str = "default") -> None:
+        self.session_id = session_id
+        self.name = name
+        self.state_path = session_dir(session_id) / f"cursor-{name}.json"
+        self.offset = 0
+        self.inode: Optional[int] = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return
+        self.offset = int(state.get("offset", 0))
+        self.inode = state.get("inode")
+
+    def save(self) -> None:
+        from write_batch import atomic_write
+
+        state = {"offset": self.offset, "inode": self.inode}
+        atomic_write(self.state_path, json.dumps(state).encode())
+
+    def iter_new(
+        self, path: os.PathLike, types: Optional[Collection[str]] = None
+    ) -> Iterator[Event]:
+        """Yield events appended since the last call, then save the offset.
+
+        The offset advances per consumed line, so stopping early resumes
+        after the last event the caller actually received.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.inode = st.st_ino
+            self.offset = 0
+        try:
+            for end, event in _iter_from(path, self.offset, types):
+                self.offset = end
+                if event is not None:
+                    yield event
+        finally:
+            self.save()
+
+
+def _iter_from(path: os.PathLike, start: int, types: Optional[Collection[str]]):
+    """Yield ``(end_offset, event)`` for each complete line from ``start``.
+
+    ``event`` is ``None`` for blank, malformed or filtered-out lines, so
+    callers tracking offsets still advance past them.
+    """
+    needles = _needles(types)
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with fh:
+        fh.seek(start)
+        offset = start
+        for raw in fh:
+            if not raw.endswith(b"\n"):
+                return
+            offset += len(raw)
+            yield offset, _decode(raw, types, needles)
+
+
+def _needles(types: Optional[Collection[str]]) -> Optional[List[bytes]]:
+    # A cheap substring test rejects most lines before json.loads runs.
+    if not types:
+        return None
+    return [json.dumps(t).encode() for t in types]
+
+
+def _decode(
+    raw: bytes, types: Optional[Collection[str]], needles: Optional[List[bytes]]
+) -> Optional[Event]:
+    if not raw.strip():
+        return None
+    if needles is not None and not any(n in raw for n in needles):
+        return None
+    try:
+        event = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    if types and event.get("type") not in types:
+        return None
+    return event
@@ -0,0 +1,207 @@
+"""Cold-start benchmark for hook entry points.
+
+Each hook in ``.claude/hooks`` is run ``--runs`` times through
+``hook_client.py --no-daemon`` in a fresh interpreter, the way Claude Code
+would run it without the daemon, and ``--runs`` more times with
+``-X importtime``.  The report covers wall-clock p50/p95/p99 per hook from
+the plain runs and the imports with the highest self time from the
+profiled ones.  It is written to ``bench_output.txt`` and
+``bench_output.json`` at the project root.
+
+Every hook's p95 is checked against a budget: ``--budget-ms`` (default
+``CLAUDE_HOOK_BUDGET_MS`` or 250), optionally overridden per hook by a
+JSON file passed with ``--budgets``::
+
+    {"default_ms": 200, "hooks": {"session_start": 400}}
+
+The process exits with status 1 when any hook is over budget, so CI can
+gate on it; ``.claude/tests/test_startup_bench.py`` applies the same gate
+under pytest, with ``CLAUDE_HOOK_BUDGETS`` naming the budgets file.
+
+Usage::
+
+    python startup_bench.py [--runs N] [--payload FILE] [hook ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from paths import hooks_dir, project_root  # noqa: E402
+from stats import summarize  # noqa: E402
+
+CLIENT = Path(__file__).resolve().parent / "hook_client.py"
+FALLBACK_BUDGET_MS = 250.0
+
+
+def _default_budget_ms() -> float:
+    raw = os.environ.get("CLAUDE_HOOK_BUDGET_MS", "").strip()
+    if not raw:
+        return FALLBACK_BUDGET_MS
+    try:
+        value = float(raw)
+    except ValueError:
+        value = 0.0
+    if value > 0:
+        return value
+    print(f"ignoring CLAUDE_HOOK_BUDGET_MS={raw!r}: not a positive number", file=sys.stderr)
+    return FALLBACK_BUDGET_MS
+
+
+DEFAULT_BUDGET_MS = _default_budget_ms()
+TOP_IMPORTS = 15
+
+
+def discover_hooks() -> List[str]:
+    directory = hooks_dir()
+    if not directory.is_dir():
+        return []
+    return sorted(p.stem for p in directory.glob("*.py") if p.stem.isidentifier())
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """Map module name to self/cumulative microseconds from ``-X importtime``."""
+    modules: Dict[str, Dict[str, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header row
+        name = fields[2].strip()
+        modules[name] = {"self_us": self_us, "cumulative_us": cumulative_us}
+    return modules
+
+
+def bench_hook(hook: str, payload: str, runs: int) -> dict:
+    """Time ``runs`` plain cold starts of ``hook``, then profile its imports
+    in another ``runs`` starts under ``-X importtime``.
+
+    The timed runs are kept separate because ``-X importtime`` traces every
+    import to stderr and would inflate the wall-clock numbers being gated.
+    """
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+    env = dict(os.environ, CLAUDE_HOOKD_DISABLE="1")
+    cmd = [sys.executable, str(CLIENT), "--no-daemon", hook]
+    wall_ms: List[float] = []
+    exit_codes = set()
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(cmd, input=payload, capture_output=True, text=True, env=env)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+        exit_codes.add(proc.returncode)
+
+    self_totals: Dict[str, int] = {}
+    cumulative_totals: Dict[str, int] = {}
+    profile_cmd = [sys.executable, "-X", "importtime", *cmd[1:]]
+    for _ in range(runs):
+        proc = subprocess.run(profile_cmd, input=payload, capture_output=True, text=True, env=env)
+        for name, times in parse_importtime(proc.stderr).items():
+            self_totals[name] = self_totals.get(name, 0) + times["self_us"]
+            cumulative_totals[name] = cumulative_totals.get(name, 0) + times["cumulative_us"]
+
+    top = sorted(self_totals, key=self_totals.__getitem__, reverse=True)[:TOP_IMPORTS]
+    return {
+        "hook": hook,
+        "wall_ms": summarize(wall_ms),
+        "exit_codes": sorted(exit_codes),
+        "imports": [
+            {
+                "module": name,
+                "self_ms": self_totals[name] / runs / 1000,
+                "cumulative_ms": cumulative_totals[name] / runs / 1000,
+            }
+            for name in top
+        ],
+    }
+
+
+def load_budgets(path: Optional[str], default_ms: float) -> Dict[str, float]:
+    budgets: Dict[str, float] = {"*": default_ms}
+    if path:
+        data = json.loads(Path(path).read_text())
+        budgets["*"] = float(data.get("default_ms", default_ms))
+        budgets.update({k: float(v) for k, v in data.get("hooks", {}).items()})
+    return budgets
+
+
+def format_report(results: List[dict], runs: int) -> str:
+    lines = [f"hook cold-start benchmark ({runs} timed + {runs} -X importtime runs per hook)", ""]
+    for result in results:
+        wall = result["wall_ms"]
+        status = "OVER BUDGET" if result["over_budget"] else "ok"
+        lines.append(
+            f"{result['hook']}: p50 {wall['p50']:.1f}ms  p95 {wall['p95']:.1f}ms  "
+            f"p99 {wall['p99']:.1f}ms  budget {result['budget_ms']:.0f}ms  [{status}]"
+        )
+        if result["exit_codes"] != [0]:
+            lines.append(f"  exit codes: {result['exit_codes']}")
+        for entry in result["imports"]:
+            lines.append(
+                f"  {entry['self_ms']:8.2f}ms self {entry['cumulative_ms']:8.2f}ms cum"
+                f"  {entry['module']}"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("hooks", nargs="*", help="hook names (default: all)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--payload", help="file with the stdin JSON to feed each hook")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument(
+        "--budgets",
+        default=os.environ.get("CLAUDE_HOOK_BUDGETS"),
+        help="JSON file with per-hook budgets (default: $CLAUDE_HOOK_BUDGETS)",
+    )
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    hooks = args.hooks or discover_hooks()
+    if not hooks:
+        print(f"no hooks found in {hooks_dir()}", file=sys.stderr)
+        return 0
+    payload = Path(args.payload).read_text() if args.payload else "{}"
+    budgets = load_budgets(args.budgets, args.budget_ms)
+
+    results = []
+    for hook in hooks:
+        result = bench_hook(hook, payload, args.runs)
+        result["budget_ms"] = budgets.get(hook, budgets["*"])
+        result["over_budget"] = result["wall_ms"]["p95"] > result["budget_ms"]
+        results.append(result)
+
+    report = format_report(results, args.runs)
+    root = project_root()
+    (root / "bench_output.txt").write_text(report)
+    (root / "bench_output.json").write_text(
+        json.dumps({"runs": args.runs, "python": sys.version, "hooks": results}, indent=2)
+    )
+    print(report)
+
+    over = [r["hook"] for r in results if r["over_budget"]]
+    if over:
+        print(f"over budget: {', '.join(over)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+"""Low-overhead latency tracing for hooks and library code.
+
+Spans are recorded with :func:`span` (a context manager) or :func:`traced`
+(a decorator)::
+
+    from tracing import span, traced
+
+    @traced
+    def build_context(payload): ...
+
+    with span("issue_store.refresh"):
+        store.refresh()
+
+Tracing is off unless ``CLAUDE_TRACE=1``.  When off, :func:`span` returns a
+shared no-op object and a :func:`traced` wrapper makes one flag check, so
+instrumented code costs a fraction of a microsecond.  When on, finished
+spans go into a fixed-size ring buffer (``CLAUDE_TRACE_BUFFER`` entries,
+default 4096) that is written to ``.claude/tmp/trace`` at exit, or earlier
+once it is half full.  ``CLAUDE_TRACE_FORMAT=binary`` selects a compact
+binary format instead of JSONL.
+
+``CLAUDE_TRACE_SAMPLE=<ms>`` additionally starts a sampling profiler that
+records the main thread's stack every ``ms`` of CPU time.  The hook daemon
+re-reads these variables for every request, from the environment its
+client forwarded.
+
+``python3 tracing.py report`` aggregates p50/p95/p99 per hook and per span,
+plus the hottest sampled stacks, across every trace file written so far.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import os
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from paths import tmp_dir
+
+SPAN = 0
+SAMPLE = 1
+KINDS = ("span", "sample")
+
+BINARY_MAGIC = b"CTRACE1\n"
+_BINARY_HEADER = "<BHHHqq"
+
+# kind, name, hook, session, wall-clock start (ns), duration (ns)
+Record = Tuple[int, str, str, str, int, int]
+
+_perf_ns = time.perf_counter_ns
+_wall_offset = time.time_ns() - _perf_ns()
+
+_enabled = False
+_buffer: Deque[Record] = deque(maxlen=4096)
+_hook = ""
+_session = ""
+
+
+class LatencyBudgetExceeded(AssertionError):
+    pass
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = _perf_ns()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        end = _perf_ns()
+        _buffer.append((SPAN, self.name, _hook, _session, self.start + _wall_offset, end - self.start))
+        return False
+
+
+def span(name: str):
+    """Context manager timing the enclosed block as ``name``."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def traced(name=None):
+    """Decorator timing each call; usable bare or as ``@traced("label")``."""
+
+    def decorate(fn: Callable) -> Callable:
+        label = name if isinstance(name, str) else f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    if callable(name):
+        return decorate(name)
+    return decorate
+
+
+def set_context(hook: str = "", session: str = "") -> None:
+    """Attribute subsequent records to a hook invocation and session."""
+    global _hook, _session
+    _hook = hook
+    _session = session
+
+
+def enable(buffer_size: Optional[int] = None) -> None:
+    global _enabled, _buffer
+    if buffer_size is not None and buffer_size != _buffer.maxlen:
+        _buffer = deque(_buffer, maxlen=buffer_size)
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def records() -> List[Record]:
+    """Snapshot of the records currently buffered."""
+    return list(_buffer)
+
+
+def clear() -> None:
+    _buffer.clear()
+
+
+# -- budgets -----------------------------------------------------------------
+
+
+class latency_budget:
+    """Context manager that raises :class:`LatencyBudgetExceeded` when the
+    block takes longer than ``ms`` milliseconds.  Always measures, whether
+    or not tracing is enabled, and records a span when it is."""
+
+    __slots__ = ("ms", "name", "start", "elapsed_ms")
+
+    def __init__(self, ms: float, name: str = "budget") -> None:
+        self.ms = ms
+        self.name = name
+        self.elapsed_ms = 0.0
+
+    def __enter__(self) -> "latency_budget":
+        self.start = _perf_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        dur = _perf_ns() - self.start
+        self.elapsed_ms = dur / 1e6
+        if _enabled:
+            _buffer.append((SPAN, self.name, _hook, _session, self.start + _wall_offset, dur))
+        if exc_type is None and self.elapsed_ms > self.ms:
+            raise LatencyBudgetExceeded(
+                f"{self.name} took {self.elapsed_ms:.3f}ms, budget {self.ms:g}ms"
+            )
+        return False
+
+
+# -- sampling profiler -------------------------------------------------------
+
+_sample_interval_ns = 0
+MAX_STACK_DEPTH = 32
+
+
+def start_sampler(interval_ms: float) -> bool:
+    """Sample the main thread's stack every ``interval_ms`` of CPU time.
+
+    Returns False where ``setitimer`` is unavailable or when not called
+    from the main thread, in which case nothing is sampled.
+    """
+    import signal
+    import threading
+
+    global _sample_interval_ns
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return False
+    _sample_interval_ns = int(interval_ms * 1e6)
+    signal.signal(signal.SIGPROF, _on_sample)
+    interval = interval_ms / 1000.0
+    signal.setitimer(signal.ITIMER_PROF, interval, interval)
+    enable()
+    return True
+
+
+def stop_sampler() -> None:
+    import signal
+
+    global _sample_interval_ns
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+    _sample_interval_ns = 0
+
+
+def _on_sample(signum, frame) -> None:
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        frames.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_name}")
+        frame = frame.f_back
+    frames.reverse()
+    stack = ";".join(frames)
+    _buffer.append((SAMPLE, stack, _hook, _session, _perf_ns() + _wall_offset, _sample_interval_ns))
+
+
+# -- output ------------------------------------------------------------------
+
+
+def trace_dir():
+    path = tmp_dir() / "trace"
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def flush(fmt: Optional[str] = None) -> Optional[str]:
+    """Write and clear the buffer; returns the file written, if any."""
+    if not _buffer:
+        return None
+    batch = list(_buffer)
+    _buffer.clear()
+    fmt = fmt or os.environ.get("CLAUDE_TRACE_FORMAT", "jsonl")
+    stem = f"{batch[0][3] or 'nosession'}-{os.getpid()}-{time.time_ns()}"
+    if fmt == "binary":
+        import struct
+
+        path = trace_dir() / f"{stem}.bin"
+        with open(path, "wb") as fh:
+            fh.write(BINARY_MAGIC)
+            for kind, name, hook, session, start, dur in batch:
+                name_b, hook_b, session_b = name.encode(), hook.encode(), session.encode()
+                fh.write(
+                    struct.pack(
+                        _BINARY_HEADER, kind, len(name_b), len(hook_b), len(session_b), start, dur
+                    )
+                )
+                fh.write(name_b + hook_b + session_b)
+    else:
+        import json
+
+        path = trace_dir() / f"{stem}.jsonl"
+        with open(path, "w") as fh:
+            for kind, name, hook, session, start, dur in batch:
+                fh.write(
+                    json.dumps(
+                        {
+                            "kind": KINDS[kind],
+                            "name": name,
+                            "hook": hook,
+                            "session": session,
+                            "start_ns": start,
+                            "dur_ns": dur,
+                        }
+                    )
+                    + "\n"
+                )
+    return str(path)
+
+
+def maybe_flush() -> None:
+    """Flush once the ring buffer is half full, before it starts dropping."""
+    if _enabled and _buffer.maxlen and len(_buffer) * 2 >= _buffer.maxlen:
+        flush()
+
+
+def _flush_at_exit() -> None:
+    if _sample_interval_ns:
+        # Interpreter shutdown restores SIGPROF's default action, which
+        # would kill the process on the next tick.
+        stop_sampler()
+    # Also when disabled: the daemon may hold records from traced requests.
+    flush()
+
+
+def read_records(path) -> Iterator[Record]:
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if data.startswith(BINARY_MAGIC):
+        import struct
+
+        header = struct.Struct(_BINARY_HEADER)
+        pos = len(BINARY_MAGIC)
+        while pos + header.size <= len(data):
+            kind, n_name, n_hook, n_session, start, dur = header.unpack_from(data, pos)
+            pos += header.size
+            name = data[pos:pos + n_name].decode()
+            pos += n_name
+            hook = data[pos:pos + n_hook].decode()
+            pos += n_hook
+            session = data[pos:pos + n_session].decode()
+            pos += n_session
+            yield (kind, name, hook, session, start, dur)
+        return
+    import json
+
+    for line in data.splitlines():
+        try:
+            rec = json.loads(line)
+            yield (
+                KINDS.index(rec["kind"]),
+                rec["name"],
+                rec.get("hook", ""),
+                rec.get("session", ""),
+                int(rec["start_ns"]),
+                int(rec["dur_ns"]),
+            )
+        except (ValueError, KeyError):
+            continue
+
+
+# -- report ------------------------------------------------------------------
+
+
+def aggregate(paths) -> Dict[str, object]:
+    from stats import summarize
+
+    per_hook: Dict[str, List[float]] = {}
+    per_span: Dict[str, List[float]] = {}
+    samples: Dict[str, int] = {}
+    sessions = set()
+    for path in paths:
+        for kind, name, hook, session, _, dur in read_records(path):
+            sessions.add(session)
+            if kind == SAMPLE:
+                leaf = name.rsplit(";", 1)[-1]
+                samples[leaf] = samples.get(leaf, 0) + 1
+            elif name == "hook":
+                per_hook.setdefault(hook, []).append(dur / 1e6)
+            else:
+                per_span.setdefault(name, []).append(dur / 1e6)
+    return {
+        "sessions": len(sessions),
+        "hooks": {k: summarize(v) for k, v in sorted(per_hook.items())},
+        "spans": {k: summarize(v) for k, v in sorted(per_span.items())},
+        "samples": dict(sorted(samples.items(), key=lambda kv: kv[1], reverse=True)),
+    }
+
+
+def format_report(result: Dict[str, object], top: int = 20) -> str:
+    lines = [f"trace report across {result['sessions']} session(s)"]
+    for title, key in (("hooks", "hooks"), ("spans", "spans")):
+        rows = result[key]
+        if not rows:
+            continue
+        lines += [
+            "",
+            f"{title}:",
+            f"  {'name':40} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+        ]
+        ranked = sorted(rows.items(), key=lambda kv: kv[1]["p95"], reverse=True)
+        for name, s in ranked[:top]:
+            lines.append(
+                f"  {name[:40]:40} {s['n']:>7} {s['p50']:>9.2f} {s['p95']:>9.2f} {s['p99']:>9.2f}"
+            )
+    if result["samples"]:
+        total = sum(result["samples"].values())
+        lines += ["", f"hottest sampled functions ({total} samples):"]
+        for name, count in list(result["samples"].items())[:top]:
+            lines.append(f"  {100.0 * count / total:5.1f}%  {name}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(prog="tracing.py")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="aggregate latency across trace files")
+    report.add_argument("--dir", help="trace directory (default .claude/tmp/trace)")
+    report.add_argument("--top", type=int, default=20)
+    report.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    directory = args.dir or trace_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError as exc:
+        print(f"tracing.py: cannot read {directory}: {exc.strerror}", file=sys.stderr)
+        return 1
+    paths = sorted(os.path.join(directory, n) for n in names if n.endswith((".jsonl", ".bin")))
+    result = aggregate(paths)
+    print(json.dumps(result, indent=2) if args.json else format_report(result, args.top))
+    return 0
+
+
+def configure_from_env() -> Tuple[bool, int, int]:
+    """Apply ``CLAUDE_TRACE``, ``CLAUDE_TRACE_BUFFER`` and
+    ``CLAUDE_TRACE_SAMPLE`` from ``os.environ``; return the previous
+    settings for :func:`restore`.
+
+    Runs at import, and again per request in the hook daemon, whose
+    clients may set different values.  Malformed values are logged and
+    ignored rather than breaking every hook.
+    """
+    previous = (_enabled, _buffer.maxlen or 0, _sample_interval_ns)
+    on = os.environ.get("CLAUDE_TRACE", "").lower() in ("1", "true", "yes", "on")
+    size = _env_number("CLAUDE_TRACE_BUFFER", int)
+    interval = _env_number("CLAUDE_TRACE_SAMPLE", float, "ms")
+    if on:
+        enable(int(size) if size else None)
+    else:
+        disable()
+    if interval:
+        if int(interval * 1e6) != _sample_interval_ns:
+            start_sampler(interval)
+        else:
+            enable()
+    elif _sample_interval_ns:
+        stop_sampler()
+    return previous
+
+
+def restore(previous: Tuple[bool, int, int]) -> None:
+    """Undo a :func:`configure_from_env` call."""
+    enabled, size, interval_ns = previous
+    if interval_ns != _sample_interval_ns:
+        if interval_ns:
+            start_sampler(interval_ns / 1e6)
+        else:
+            stop_sampler()
+    enable(size or None)
+    if not enabled:
+        disable()
+
+
+def _env_number(
+    name: str, convert: Callable[[str], float], unit: str = ""
+) -> Optional[float]:
+    """Positive number from an environment variable, optionally suffixed
+    with ``unit``; None when unset or malformed."""
+    raw = os.environ.get(name, "").strip()
+    if unit and raw.endswith(unit):
+        raw = raw[: -len(unit)].strip()
+    if not raw:
+        return None
+    try:
+        value = convert(raw)
+    except ValueError:
+        value = 0
+    if value > 0:
+        return value
+    import logging
+
+    logging.getLogger(__name__).warning("ignoring %s=%r: not a positive number", name, raw)
+    return None
+
+
+configure_from_env()
+atexit.register(_flush_at_exit)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
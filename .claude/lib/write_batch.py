@@ -0,0 +1,261 @@
+"""Coalesced, locked writers for JSONL logs and JSON state files.
+
+Several hooks can fire at once, and rewriting a whole file per mutation
+makes each write O(file size).  Two writers share one buffering policy:
+
+* :class:`AppendBuffer` queues records and writes them in a single
+  ``O_APPEND`` write, so readers never see a partial batch;
+* :class:`StateWriter` keeps only the latest value and replaces the file
+  via write-to-temp and ``os.replace``.
+
+Appending an updated record leaves the older line for the same key in
+place; readers take the last one.  :func:`compact_jsonl` drops the
+superseded lines, as an explicit and occasional full rewrite.
+
+Pending data is flushed ``debounce`` seconds after the first unflushed
+mutation (the timer is not pushed back by later ones), on an explicit
+:meth:`flush`, and at interpreter exit.  With ``auto_flush=False`` only
+the last two apply.  Defaults follow beads' ``flush-debounce`` and
+``no-auto-flush`` settings.  Every flush holds an advisory ``flock`` on
+``<file>.lock`` so concurrent processes cannot interleave lines.
+"""
+
+from __future__ import annotations
+
+import abc
+import atexit
+import fcntl
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+from beads_config import as_bool, setting
+
+DEFAULT_DEBOUNCE = 5.0
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(text: Union[str, float, int]) -> float:
+    """Seconds in a Go-style duration such as ``"5s"``, ``"250ms"`` or ``"1m30s"``."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    text = text.strip()
+    if text == "0":
+        # The one unitless duration Go's time.ParseDuration accepts.
+        return 0.0
+    pos = 0
+    total = 0.0
+    for match in _DURATION.finditer(text):
+        if match.start() != pos:
+            break
+        total += float(match.group(1)) * _UNITS[match.group(2)]
+        pos = match.end()
+    if pos != len(text) or not text:
+        raise ValueError(f"invalid duration: {text!r}")
+    return total
+
+
+def default_debounce() -> float:
+    return parse_duration(setting("flush-debounce", DEFAULT_DEBOUNCE))
+
+
+def default_auto_flush() -> bool:
+    return not as_bool(setting("no-auto-flush", False))
+
+
+@contextmanager
+def file_lock(path: os.PathLike, shared: bool = False) -> Iterator[None]:
+    """Advisory lock on ``<path>.lock``.
+
+    A sidecar file is locked rather than ``path`` itself because atomic
+    replacement gives ``path`` a new inode on every write.
+    """
+    lock_file = Path(f"{os.fspath(path)}.lock")
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: os.PathLike, data: bytes) -> None:
+    """Replace ``path`` with ``data`` under its lock; readers see old or new."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(path):
+        _replace(path, data)
+
+
+def _replace(path: Path, data: bytes) -> None:
+    """Write-to-temp and rename; the caller holds ``path``'s lock."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+# Writers with unflushed data.  These are strong references, so a writer
+# dropped by its owner still gets flushed at exit.
+_pending_writers: "Set[_BufferedWriter]" = set()
+
+
+class _BufferedWriter(abc.ABC):
+    def __init__(
+        self,
+        path: os.PathLike,
+        debounce: Optional[float] = None,
+        auto_flush: Optional[bool] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.debounce = default_debounce() if debounce is None else debounce
+        self.auto_flush = default_auto_flush() if auto_flush is None else auto_flush
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def _schedule(self) -> None:
+        """Arrange a flush for newly pending data; caller holds ``_lock``."""
+        _pending_writers.add(self)
+        if not self.auto_flush or self._timer is not None:
+            return
+        if self.debounce <= 0:
+            self.flush()
+            return
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._write_pending()
+            _pending_writers.discard(self)
+
+    @abc.abstractmethod
+    def _write_pending(self) -> None:
+        """Write and clear pending data; caller holds ``_lock``."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+
+class AppendBuffer(_BufferedWriter):
+    """Batched appends to a JSONL file."""
+
+    def __init__(self, path, debounce=None, auto_flush=None) -> None:
+        super().__init__(path, debounce, auto_flush)
+        self._pending: List[bytes] = []
+
+    def append(self, record: Any) -> None:
+        """Queue one record: a JSON-serialisable value or a preformatted line."""
+        line = record if isinstance(record, str) else json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._pending.append(line.rstrip("\n").encode() + b"\n")
+            self._schedule()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _write_pending(self) -> None:
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path):
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                # Never glue a record onto a line a crashed writer left open.
+                if size and os.pread(fd, 1, size - 1) != b"\n":
+                    data = b"\n" + data
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+        self._pending.clear()
+
+
+def compact_jsonl(path: os.PathLike, key: str = "id") -> int:
+    """Rewrite a keyed JSONL file with one line per key; return the number
+    of superseded lines dropped.
+
+    Each key keeps the position of its first line and the content of its
+    last.  Lines that are not keyed JSON objects are kept as they are.
+    This costs O(file size) and gives the file a new inode, which makes
+    incremental readers start over, so call it rarely rather than per
+    write.
+    """
+    path = Path(path)
+    with file_lock(path):
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return 0
+        # Unkeyed lines are stored under their (int) line number, which
+        # cannot collide with a string key.
+        lines: Dict[object, bytes] = {}
+        total = 0
+        for lineno, line in enumerate(data.splitlines()):
+            if line.strip():
+                total += 1
+                record_key = _record_key(line, key)
+                lines[lineno if record_key is None else record_key] = line
+        dropped = total - len(lines)
+        if dropped:
+            _replace(path, b"".join(line + b"\n" for line in lines.values()))
+    return dropped
+
+
+def _record_key(line: bytes, key: str) -> Optional[str]:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    value = record.get(key) if isinstance(record, dict) else None
+    return value if isinstance(value, str) else None
+
+
+class StateWriter(_BufferedWriter):
+    """Coalesced whole-file JSON state: only the latest value is written."""
+
+    _UNSET = object()
+
+    def __init__(self, path, debounce=None, auto_flush=None) -> None:
+        super().__init__(path, debounce, auto_flush)
+        self._value: Any = self._UNSET
+
+    def set(self, value: Any) -> None:
+        with self._lock:
+            self._value = value
+            self._schedule()
+
+    @property
+    def dirty(self) -> bool:
+        return self._value is not self._UNSET
+
+    def _write_pending(self) -> None:
+        if self._value is self._UNSET:
+            return
+        atomic_write(self.path, json.dumps(self._value, indent=2).encode() + b"\n")
+        self._value = self._UNSET
+
+
+def flush_all() -> None:
+    for writer in list(_pending_writers):
+        writer.flush()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,9 @@
+"""Shared pytest configuration for ``.claude/tests``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lib"))
+
+# pytest_latency sits next to this file, which pytest puts on sys.path.
+pytest_plugins = ["pytest_latency"]
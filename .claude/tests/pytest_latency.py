@@ -0,0 +1,75 @@
+"""pytest plugin for latency budgets, built on :mod:`tracing`.
+
+Enabled from ``conftest.py`` via ``pytest_plugins``; it lives with the
+tests so that hook code never imports pytest.  It adds:
+
+``@pytest.mark.latency_budget(ms)``
+    Fails the test when its call phase takes longer than ``ms``.
+
+``latency_budget`` fixture
+    :class:`tracing.latency_budget`, for budgets on part of a test::
+
+        def test_refresh(latency_budget, store):
+            with latency_budget(5, "refresh"):
+                store.refresh()
+
+``trace_spans`` fixture
+    Turns tracing on for one test and returns a function listing the spans
+    recorded so far as ``(name, duration_ms)`` pairs.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Tuple
+
+import pytest
+
+import tracing
+
+
+def pytest_configure(config) -> None:
+    config.addinivalue_line(
+        "markers", "latency_budget(ms): fail if the test body takes longer than ms milliseconds"
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("latency_budget")
+    started = time.perf_counter_ns()
+    outcome = yield
+    if marker is None or outcome.excinfo is not None:
+        return
+    budget = float(marker.args[0] if marker.args else marker.kwargs["ms"])
+    elapsed = (time.perf_counter_ns() - started) / 1e6
+    if elapsed > budget:
+        outcome.force_exception(
+            tracing.LatencyBudgetExceeded(
+                f"{item.nodeid} took {elapsed:.3f}ms, budget {budget:g}ms"
+            )
+        )
+
+
+@pytest.fixture
+def latency_budget():
+    return tracing.latency_budget
+
+
+@pytest.fixture
+def trace_spans() -> Callable[[], List[Tuple[str, float]]]:
+    was_enabled = tracing.is_enabled()
+    tracing.clear()
+    tracing.enable()
+
+    def spans() -> List[Tuple[str, float]]:
+        return [
+            (name, dur / 1e6)
+            for kind, name, _, _, _, dur in tracing.records()
+            if kind == tracing.SPAN
+        ]
+
+    yield spans
+    tracing.clear()
+    if not was_enabled:
+        tracing.disable()
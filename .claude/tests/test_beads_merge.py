@@ -0,0 +1,119 @@
+import json
+import random
+
+import pytest
+
+from beads_merge import (
+    MergeError,
+    _timestamp,
+    index_lines,
+    merge_files,
+    merge_indexes,
+    mutate,
+    synthetic_issues,
+)
+
+
+def dump(**issue):
+    return json.dumps(issue, separators=(",", ":")).encode()
+
+
+def merge_one(base, left, right):
+    """Merge single-record sides in both orders; they must agree."""
+    sides = [{b"x": line} if line is not None else {} for line in (base, left, right)]
+    lines = merge_indexes(*sides)[0]
+    assert merge_indexes(sides[0], sides[2], sides[1])[0] == lines
+    return json.loads(lines[0]) if lines else None
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_convergence_properties(seed):
+    rng = random.Random(seed)
+    for _ in range(10):
+        b = synthetic_issues(50, rng)
+        x = mutate(b, rng, rate=0.4)
+        y = mutate(b, rng, rate=0.4)
+        expected_x = [x[i] for i in sorted(x)]
+        xy = merge_indexes(b, x, y)[0]
+        assert xy == merge_indexes(b, y, x)[0]
+        assert merge_indexes(b, b, x)[0] == expected_x
+        assert merge_indexes(b, x, b)[0] == expected_x
+        assert merge_indexes(b, x, x)[0] == expected_x
+        for line in xy:
+            issue = json.loads(line)
+            assert issue.get("status") == "closed" or "closed_at" not in issue
+
+
+def test_edit_beats_delete():
+    base = dump(id="x", title="t")
+    edited = dump(id="x", title="u")
+    assert merge_one(base, edited, None)["title"] == "u"
+    assert merge_one(base, base, None) is None
+
+
+def test_disjoint_fields_and_lists_merge():
+    base = dump(id="x", title="t", priority=2, labels=["a", "b"], updated_at="2025-01-01T00:00:00Z")
+    left = dump(id="x", title="u", priority=2, labels=["a", "c"], updated_at="2025-01-02T00:00:00Z")
+    right = dump(id="x", title="t", priority=1, labels=["a", "b", "d"], updated_at="2025-01-03T00:00:00Z")
+    merged = merge_one(base, left, right)
+    assert (merged["title"], merged["priority"]) == ("u", 1)
+    assert sorted(merged["labels"]) == ["a", "c", "d"]
+    assert merged["updated_at"] == "2025-01-03T00:00:00Z"
+
+
+@pytest.mark.parametrize(
+    "newer, older",
+    [
+        ("2025-01-01T10:00:00.5Z", "2025-01-01T10:00:00Z"),
+        ("2025-01-01T10:00:00.1Z", "2025-01-01T09:59:59.999999999Z"),
+        ("2025-01-01T10:00:00-08:00", "2025-01-01T12:00:00Z"),
+        ("2025-01-01T10:00:00.123456789+00:00", "2025-01-01T10:00:00.12Z"),
+    ],
+)
+def test_newer_timestamp_wins_regardless_of_format(newer, older):
+    assert _timestamp(newer) > _timestamp(older)
+    base = dump(id="x", title="t", updated_at="2025-01-01T00:00:00Z")
+    left = dump(id="x", title="left", updated_at=newer)
+    right = dump(id="x", title="right", updated_at=older)
+    merged = merge_one(base, left, right)
+    assert (merged["title"], merged["updated_at"]) == ("left", newer)
+
+
+def test_unparseable_timestamps_sort_first():
+    assert _timestamp(None) == _timestamp("nonsense")
+    assert _timestamp("nonsense") < _timestamp("2000-01-01T00:00:00Z")
+
+
+def test_reopen_after_close_wins_across_offsets():
+    base = dump(id="x", status="in_progress", updated_at="2025-01-01T00:00:00Z")
+    closed = dump(
+        id="x", status="closed", closed_at="2025-01-02T12:00:00Z", updated_at="2025-01-02T12:00:00Z"
+    )
+    # 05:00-08:00 is 13:00Z, after the close.
+    reopened = dump(id="x", status="open", updated_at="2025-01-02T05:00:00-08:00")
+    merged = merge_one(base, closed, reopened)
+    assert merged["status"] == "open" and "closed_at" not in merged
+    # 03:00-08:00 is 11:00Z, before the close.
+    reopened = dump(id="x", status="open", updated_at="2025-01-02T03:00:00-08:00")
+    merged = merge_one(base, closed, reopened)
+    assert (merged["status"], merged["closed_at"]) == ("closed", "2025-01-02T12:00:00Z")
+
+
+def test_merge_files_and_errors(tmp_path):
+    base, ours, theirs = (tmp_path / n for n in ("base", "ours", "theirs"))
+    ours.write_bytes(dump(id="b") + b"\n" + dump(id="a") + b"\n")
+    theirs.write_bytes(dump(id="c") + b"\n")
+    data, field_merges = merge_files(str(base), str(ours), str(theirs))
+    assert [json.loads(line)["id"] for line in data.splitlines()] == ["a", "b", "c"]
+    assert field_merges == 0
+    with pytest.raises(MergeError):
+        index_lines(b"<<<<<<< HEAD\n")
+
+
+def test_merge_latency(latency_budget):
+    rng = random.Random(0)
+    base = synthetic_issues(10_000, rng)
+    left, right = mutate(base, rng), mutate(base, rng)
+    blobs = [b"".join(v + b"\n" for v in side.values()) for side in (base, left, right)]
+    with latency_budget(500, "beads_merge 10k"):
+        merge_indexes(*(index_lines(blob) for blob in blobs))
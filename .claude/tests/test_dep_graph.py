@@ -0,0 +1,91 @@
+import random
+
+from dep_graph import READY_STATUSES, DependencyGraph, synthetic_issues
+from issue_store import OPEN_STATUSES
+
+
+def expected_sets(issues):
+    """Ready and blocked ids computed from scratch."""
+    latest = {issue["id"]: issue for issue in issues}
+
+    def is_open(issue_id):
+        issue = latest.get(issue_id)
+        return issue is not None and issue.get("status") in OPEN_STATUSES
+
+    ready, blocked = set(), set()
+    for issue_id, issue in latest.items():
+        blockers = {
+            d["depends_on_id"]
+            for d in issue.get("dependencies", [])
+            if d.get("type", "blocks") == "blocks" and d["depends_on_id"] != issue_id
+        }
+        open_blockers = any(is_open(b) for b in blockers)
+        if issue.get("status") in READY_STATUSES and not open_blockers:
+            ready.add(issue_id)
+        elif is_open(issue_id) and open_blockers:
+            blocked.add(issue_id)
+    return ready, blocked
+
+
+def test_incremental_updates_match_full_recompute():
+    rng = random.Random(3)
+    issues = {i["id"]: i for i in synthetic_issues(300, seed=3)}
+    graph = DependencyGraph.from_issues(issues.values())
+    assert (set(graph.ready()), set(graph.blocked())) == expected_sets(issues.values())
+    ids = list(issues)
+    for step in range(500):
+        issue = dict(issues[rng.choice(ids)])
+        roll = rng.random()
+        if roll < 0.5:
+            issue["status"] = rng.choice(["open", "in_progress", "blocked", "closed"])
+        elif roll < 0.8:
+            issue["dependencies"] = [
+                {"issue_id": issue["id"], "depends_on_id": rng.choice(ids), "type": "blocks"}
+                for _ in range(rng.randint(0, 3))
+            ]
+        else:
+            issue["priority"] = rng.randint(0, 4)
+        issues[issue["id"]] = issue
+        graph.update(issue)
+        assert (set(graph.ready()), set(graph.blocked())) == expected_sets(issues.values()), step
+
+
+def test_ready_top_orders_by_priority_then_id():
+    graph = DependencyGraph.from_issues(
+        [
+            {"id": "a", "status": "open", "priority": 2},
+            {"id": "b", "status": "open", "priority": 1},
+            {"id": "c", "status": "open", "priority": 1},
+            {"id": "d", "status": "closed", "priority": 0},
+        ]
+    )
+    assert graph.ready_top(2) == ["b", "c"]
+    assert graph.ready_top(10) == ["b", "c", "a"]
+
+
+def test_blockers_and_critical_path():
+    graph = DependencyGraph.from_issues(
+        [
+            {"id": "a", "status": "open"},
+            {"id": "b", "status": "open", "dependencies": [{"depends_on_id": "a"}]},
+            {"id": "c", "status": "open", "dependencies": [{"depends_on_id": "b"}]},
+        ]
+    )
+    assert graph.ready() == {"a"} and graph.blocked() == {"b", "c"}
+    assert graph.critical_path() == ["a", "b", "c"]
+    graph.update({"id": "a", "status": "closed"})
+    assert graph.ready() == {"b"} and graph.open_blockers("c") == ["b"]
+    assert graph.critical_path() == ["b", "c"]
+    graph.remove("b")
+    assert graph.ready() == {"c"} and graph.blocked() == frozenset()
+
+
+def test_unchanged_queries_reuse_results(latency_budget):
+    graph = DependencyGraph.from_issues(synthetic_issues(20_000))
+    assert graph.ready() is graph.ready()
+    assert graph.blocked() is graph.blocked()
+    target = {"id": "b-7", "status": "closed"}
+    with latency_budget(5, "DependencyGraph.update + ready"):
+        graph.update(target)
+        graph.ready()
+        graph.blocked()
@@ -0,0 +1,61 @@
+import os
+import socket
+import stat
+
+import pytest
+
+import hook_client
+
+
+def test_env_seconds(monkeypatch, capsys):
+    monkeypatch.setenv("CLAUDE_HOOKD_TIMEOUT", "2.5")
+    assert hook_client.env_seconds("CLAUDE_HOOKD_TIMEOUT", 60.0) == 2.5
+    for bad in ("soon", "0", "-3"):
+        monkeypatch.setenv("CLAUDE_HOOKD_TIMEOUT", bad)
+        assert hook_client.env_seconds("CLAUDE_HOOKD_TIMEOUT", 60.0) == 60.0
+    assert "ignoring CLAUDE_HOOKD_TIMEOUT" in capsys.readouterr().err
+
+
+def test_private_dir_is_created_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = hook_client.private_dir()
+    assert path == tmp_path / "claude-hookd"
+    assert stat.S_IMODE(os.lstat(path).st_mode) == 0o700
+
+
+def test_private_dir_rejects_shared_or_linked_dirs(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    (tmp_path / "claude-hookd").mkdir(mode=0o700)
+    os.chmod(tmp_path / "claude-hookd", 0o755)
+    with pytest.raises(PermissionError):
+        hook_client.private_dir()
+    os.rmdir(tmp_path / "claude-hookd")
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    os.symlink(tmp_path / "elsewhere", tmp_path / "claude-hookd")
+    with pytest.raises(PermissionError):
+        hook_client.private_dir()
+
+
+def test_long_project_paths_use_private_dir(tmp_path, monkeypatch):
+    project = tmp_path / ("p" * 120)
+    project.mkdir()
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(project))
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = hook_client.socket_path()
+    assert path.parent == tmp_path / "claude-hookd" and path.suffix == ".sock"
+
+
+def test_connect_refuses_socket_owned_by_someone_else(tmp_path, monkeypatch):
+    path = tmp_path / "hookd.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+    monkeypatch.setattr(hook_client, "socket_path", lambda: path)
+    try:
+        hook_client.connect().close()
+        real_uid = os.getuid()
+        monkeypatch.setattr(hook_client.os, "getuid", lambda: real_uid + 1)
+        with pytest.raises(PermissionError):
+            hook_client.connect()
+    finally:
+        server.close()
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from hook_client import socket_path
+from hook_runtime import run_hook
+
+LIB = Path(__file__).resolve().parent.parent / "lib"
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / ".claude" / "hooks").mkdir(parents=True)
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def write_hook(project, name, body):
+    (project / ".claude" / "hooks" / f"{name}.py").write_text(body)
+
+
+def test_return_values_are_coerced(project):
+    write_hook(project, "as_dict", "def run(payload):\n    return {'seen': payload['x']}\n")
+    result = run_hook("as_dict", '{"x": 1}')
+    assert (result.stdout, result.exit_code) == ('{"seen": 1}', 0)
+
+
+def test_printed_output_is_captured(project):
+    write_hook(
+        project,
+        "chatty",
+        "import sys\n"
+        "def run(payload):\n"
+        "    print('hello')\n"
+        "    print('careful', file=sys.stderr)\n"
+        "    return 'done'\n",
+    )
+    result = run_hook("chatty", "{}")
+    assert result.stdout == "hello\ndone"
+    assert result.stderr == "careful\n"
+
+
+def test_system_exit_becomes_exit_code(project):
+    write_hook(project, "quits", "def run(payload):\n    print('bye')\n    raise SystemExit(2)\n")
+    result = run_hook("quits", "{}")
+    assert (result.stdout, result.exit_code) == ("bye\n", 2)
+    write_hook(project, "says_why", "import sys\ndef run(payload):\n    sys.exit('nope')\n")
+    result = run_hook("says_why", "{}")
+    assert (result.stderr, result.exit_code) == ("nope\n", 1)
+
+
+def test_exceptions_become_tracebacks(project):
+    write_hook(project, "broken", "def run(payload):\n    raise RuntimeError('boom')\n")
+    result = run_hook("broken", "{}")
+    assert result.exit_code == 1 and "RuntimeError: boom" in result.stderr
+
+
+def test_reused_result_object_is_not_mutated(project):
+    write_hook(
+        project,
+        "cached",
+        "from hook_runtime import HookResult\n"
+        "RESULT = HookResult(stdout='x')\n"
+        "def run(payload):\n"
+        "    print('p')\n"
+        "    return RESULT\n",
+    )
+    for _ in range(2):
+        assert run_hook("cached", "{}").stdout == "p\nx"
+
+
+def test_daemon_survives_system_exit_and_runs_hook_once(project):
+    out = project / "ran.txt"
+    write_hook(
+        project,
+        "once",
+        "def run(payload):\n"
+        f"    with open({str(out)!r}, 'a') as fh:\n"
+        "        fh.write('ran\\n')\n"
+        "    print('hi')\n"
+        "    raise SystemExit(2)\n",
+    )
+    env = {**os.environ, "CLAUDE_PROJECT_DIR": str(project), "CLAUDE_HOOKD_AUTOSTART": "0"}
+    daemon = subprocess.Popen([sys.executable, str(LIB / "hook_daemon.py"), "serve"], env=env)
+    try:
+        for _ in range(100):
+            if socket_path().exists():
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail("hook daemon did not start")
+        client = subprocess.run(
+            [sys.executable, str(LIB / "hook_client.py"), "once"],
+            env=env, input="{}", capture_output=True, text=True,
+        )
+        assert (client.stdout, client.returncode) == ("hi\n", 2)
+        assert out.read_text() == "ran\n"
+        assert daemon.poll() is None
+    finally:
+        daemon.terminate()
+        daemon.wait(5)
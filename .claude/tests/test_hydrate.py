@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+import hydrate
+import write_batch
+from beads_config import _parse_simple
+from hydrate import HASH_HIT, MISSING, PARSED, STAT_HIT, configured_repos, jsonl_for, load_repo
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "main"
+    root.mkdir()
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(root))
+    return root
+
+
+def test_parse_simple_nested_and_indentless_lists():
+    config = _parse_simple(
+        "repos:\n"
+        "  primary: \".\"\n"
+        "  additional:\n"
+        "  - ~/a\n"
+        "  - '../b'  # comment\n"
+        "flush-debounce: 5s\n"
+        "labels:\n"
+        "    - x\n"
+    )
+    assert config == {
+        "repos": {"primary": ".", "additional": ["~/a", "../b"]},
+        "flush-debounce": "5s",
+        "labels": ["x"],
+    }
+
+
+def test_scalar_additional_is_one_repo(project, tmp_path):
+    primary, additional = configured_repos({"repos": {"additional": "../other"}})
+    assert primary == project.resolve()
+    assert additional == [(tmp_path / "other").resolve()]
+    assert configured_repos({"repos": "nonsense"}) == (project.resolve(), [])
+
+
+def test_load_repo_cache_levels(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path))
+    jsonl = jsonl_for(tmp_path / "other")
+    assert load_repo(jsonl) == ({}, MISSING)
+    jsonl.parent.mkdir(parents=True)
+    jsonl.write_text(json.dumps({"id": "o-1", "status": "open"}) + "\n")
+    issues, how = load_repo(jsonl)
+    assert (list(issues), how) == (["o-1"], PARSED)
+    assert load_repo(jsonl)[1] == STAT_HIT
+    hydrate._loaded.clear()
+    assert load_repo(jsonl)[1] == STAT_HIT  # from the on-disk cache
+    st = os.stat(jsonl)
+    os.utime(jsonl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))  # same content
+    hydrate._loaded.clear()
+    assert load_repo(jsonl)[1] == HASH_HIT
+
+
+def write_issues(jsonl, *issues):
+    jsonl.parent.mkdir(parents=True, exist_ok=True)
+    jsonl.write_text("".join(json.dumps(issue) + "\n" for issue in issues))
+
+
+@pytest.fixture
+def workspace(project, tmp_path, monkeypatch):
+    monkeypatch.setenv("BEADS_FLUSH_DEBOUNCE", "1h")
+    write_issues(jsonl_for(project), {"id": "m-1", "status": "open"}, {"id": "s-1", "status": "open"})
+    write_issues(
+        jsonl_for(tmp_path / "a"),
+        {"id": "a-1", "status": "open"},
+        {"id": "s-1", "status": "closed"},
+        {"id": "s-2", "status": "closed"},
+    )
+    write_issues(
+        jsonl_for(tmp_path / "b"),
+        {"id": "b-1", "status": "blocked"},
+        {"id": "s-2", "status": "open"},
+        {"id": "x-1", "status": "open"},
+    )
+    return {"repos": {"additional": ["../a", "../b"]}}
+
+
+def test_hydrate_merges_repositories_and_routes_writes(workspace, project, tmp_path):
+    main, a, b = (jsonl_for(p.resolve()) for p in (project, tmp_path / "a", tmp_path / "b"))
+    index = hydrate.hydrate(workspace)
+    assert sorted(index.issues) == ["a-1", "b-1", "m-1", "s-1", "s-2", "x-1"]
+    assert index.get("s-1")["status"] == "open"  # primary beats additional
+    assert index.get("s-2")["status"] == "closed"  # earlier additional beats later
+    assert (index.source_of("s-1"), index.source_of("s-2"), index.source_of("b-1")) == (main, a, b)
+    assert index.source_of("nope") is None
+    assert [i["id"] for i in index.by_status("blocked")] == ["b-1"]
+    assert set(index.load_stats.values()) == {PARSED}
+
+    assert index.write_path({"id": "x-1"}) == b
+    assert index.write_path({"id": "a-7"}) == a
+    assert index.write_path({"id": "zz-1"}) == main
+    assert index.record({"id": "b-9", "status": "open"}) == b
+    assert index.record({"id": "s-2", "status": "open"}) == a
+    write_batch.flush_all()
+    assert b.read_text().splitlines()[-1] == '{"id":"b-9","status":"open"}'
+    assert a.read_text().splitlines()[-1] == '{"id":"s-2","status":"open"}'
+    assert "b-9" not in main.read_text()
+
+
+def test_warm_hydrate_hits_stat_cache(workspace, tmp_path):
+    repos = [(tmp_path / name).resolve() for name in ("a", "b")]
+    hydrate.hydrate(workspace)
+    assert hydrate.hydrate(workspace).load_stats == dict.fromkeys(repos, STAT_HIT)
+    hydrate._loaded.clear()
+    assert hydrate.hydrate(workspace).load_stats == dict.fromkeys(repos, STAT_HIT)
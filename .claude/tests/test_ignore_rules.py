@@ -0,0 +1,88 @@
+import shutil
+import subprocess
+
+import pytest
+
+from file_index import FileIndex
+from ignore_rules import IgnoreMatcher, parse_lines
+
+
+def matcher(*lines):
+    return IgnoreMatcher(parse_lines(lines))
+
+
+@pytest.mark.parametrize(
+    "pattern, path, ignored",
+    [
+        ("*.log", "a/b/x.log", True),
+        ("/build", "build", True),
+        ("/build", "src/build", False),
+        ("doc/*.txt", "doc/a.txt", True),
+        ("doc/*.txt", "doc/x/a.txt", False),
+        ("a/**/b", "a/x/y/b", True),
+        ("a/**/b", "a/b", True),
+        ("**/cache", "deep/er/cache", True),
+        ("f?o", "fao", True),
+        ("f?o", "f/o", False),
+        ("[]a]", "]", True),
+        ("[]a]", "a", True),
+        ("[]a]", "b", False),
+        ("[!]a]x", "bx", True),
+        ("[!]a]x", "]x", False),
+        ("x[[:digit:]]", "x7", True),
+        ("x[[:digit:]]", "xa", False),
+        ("[[:upper:]_]*", "_tmp", True),
+        ("[a-c]", "b", True),
+        ("[a-c]", "d", False),
+        ("a[/]b", "a/b", False),
+        ("[abc", "[abc", True),
+        ("\\#notes", "#notes", True),
+    ],
+)
+def test_pattern_semantics(pattern, path, ignored):
+    assert matcher(pattern).matches(path) is ignored
+
+
+def test_negation_and_dir_only():
+    m = matcher("*.log", "!keep.log", "out/")
+    assert m.matches("a.log") and not m.matches("keep.log")
+    assert m.matches("out", is_dir=True) and not m.matches("out")
+    assert m.is_ignored("out/anything.txt")
+
+
+def test_invalid_rules_are_skipped(caplog):
+    m = matcher("[[:nonsense:]]", "*.tmp")
+    assert len(m) == 1 and m.matches("x.tmp")
+    assert "nonsense" in caplog.text
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_file_index_matches_git(tmp_path, latency_budget):
+    root = tmp_path / "repo"
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    (root / ".gitignore").write_text(
+        "*.log\n!keep.log\nbuild/\n/top.txt\nx[[:digit:]]\n[]a]\ndocs/**/*.tmp\n"
+    )
+    (root / "sub").mkdir()
+    (root / "sub" / ".gitignore").write_text("local.txt\n")
+    files = [
+        "a.log", "keep.log", "top.txt", "sub/top.txt", "sub/local.txt", "local.txt",
+        "x1", "xa", "]", "a", "b", "build/out.o", "src/build/y", "docs/a/b/c.tmp",
+        "docs/a.md",
+    ]
+    for name in files:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    git = subprocess.run(
+        ["git", "ls-files", "-o", "--exclude-standard"],
+        cwd=root, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    index = FileIndex(root, tmp_path / "index.pickle")
+    index.refresh()
+    assert sorted(index.files()) == sorted(git)
+
+    warm = FileIndex(root, tmp_path / "index.pickle")
+    with latency_budget(20, "FileIndex.refresh warm"):
+        assert warm.refresh() == 0
+    assert sorted(warm.files()) == sorted(git)
@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+
+from issue_store import IssueStore
+
+
+def line(issue_id, status="open", priority=2, **extra):
+    return json.dumps({"id": issue_id, "status": status, "priority": priority, **extra}) + "\n"
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    path = tmp_path / "issues.jsonl"
+    path.write_text(line("b-1") + line("b-2", status="closed"))
+    return path
+
+
+def append(path, text):
+    with open(path, "a") as fh:
+        fh.write(text)
+
+
+def test_initial_load_indexes_everything(jsonl):
+    store = IssueStore(jsonl)
+    assert store.refresh() == {"b-1", "b-2"}
+    assert [i["id"] for i in store.by_status("open")] == ["b-1"]
+    assert store.counts_by_status() == {"open": 1, "closed": 1}
+    assert store.refresh() == set()
+
+
+def test_append_is_consumed_incrementally(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    generation = store.generation
+    append(jsonl, line("b-1", status="closed") + line("b-3"))
+    assert store.refresh() == {"b-1", "b-3"}
+    assert store.generation == generation + 1
+    assert store.get("b-1")["status"] == "closed"
+    assert [i["id"] for i in store.by_status("open")] == ["b-3"]
+
+
+def test_partial_trailing_line_waits_for_newline(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    partial = line("b-3")
+    append(jsonl, partial[:10])
+    assert store.refresh() == set()
+    assert "b-3" not in store
+    append(jsonl, partial[10:])
+    assert store.refresh() == {"b-3"}
+
+
+def test_truncation_rebuilds(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    jsonl.write_text(line("b-9"))
+    assert store.refresh() == {"b-1", "b-2", "b-9"}
+    assert len(store) == 1
+
+
+def test_replaced_file_rebuilds(jsonl, tmp_path):
+    store = IssueStore(jsonl)
+    store.refresh()
+    replacement = tmp_path / "new.jsonl"
+    replacement.write_text(line("b-1") + line("b-2", status="closed") + line("b-4"))
+    os.replace(replacement, jsonl)
+    store.refresh()
+    assert sorted(i["id"] for i in store) == ["b-1", "b-2", "b-4"]
+
+
+def test_same_size_rewrite_is_detected_by_mtime(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    st = os.stat(jsonl)
+    with open(jsonl, "r+") as fh:
+        fh.write(line("b-7"))
+    os.utime(jsonl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert os.stat(jsonl).st_size == st.st_size
+    store.refresh()
+    assert "b-7" in store and "b-1" not in store
+
+
+def test_rewrite_that_grows_is_detected_by_fingerprint(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    with open(jsonl, "r+") as fh:
+        fh.write(line("b-1") + line("b-2", status="open") + line("b-5"))
+    store.refresh()
+    assert sorted(i["id"] for i in store) == ["b-1", "b-2", "b-5"]
+    assert store.get("b-2")["status"] == "open"
+
+
+def test_missing_file_resets(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    jsonl.unlink()
+    assert store.refresh() == {"b-1", "b-2"}
+    assert len(store) == 0
+
+
+def test_malformed_and_unindexable_records_are_skipped(jsonl):
+    store = IssueStore(jsonl)
+    store.refresh()
+    append(jsonl, "not json\n" + line("b-1", status=["x"]) + line("b-6", priority=1))
+    assert store.refresh() == {"b-6"}
+    assert store.get("b-1")["status"] == "open"
+    assert [i["id"] for i in store.by_priority(1)] == ["b-6"]
+    append(jsonl, line("b-10"))
+    assert store.refresh() == {"b-10"}
+
+
+def test_incremental_refresh_latency(tmp_path, latency_budget):
+    path = tmp_path / "issues.jsonl"
+    path.write_text("".join(line(f"b-{i}", priority=i % 5) for i in range(20_000)))
+    store = IssueStore(path)
+    store.refresh()
+    append(path, line("b-1", status="closed"))
+    with latency_budget(20, "IssueStore.refresh incremental"):
+        assert store.refresh() == {"b-1"}
+    with latency_budget(5, "IssueStore.refresh unchanged"):
+        assert store.refresh() == set()
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from session_stream import SessionCursor, iter_events, iter_events_reverse, tail
+
+
+def write_events(path, events, partial=""):
+    path.write_text("".join(json.dumps(e) + "\n" for e in events) + partial)
+
+
+@pytest.fixture
+def events():
+    return [{"type": "user" if i % 3 else "tool", "n": i, "pad": "x" * (i % 17)} for i in range(500)]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 4096])
+def test_reverse_matches_forward(tmp_path, events, block_size):
+    path = tmp_path / "events.jsonl"
+    write_events(path, events, partial='{"type": "user", "n": 99')
+    forward = list(iter_events(path))
+    assert forward == events
+    assert list(iter_events_reverse(path, block_size=block_size)) == forward[::-1]
+    users = [e for e in events if e["type"] == "user"]
+    assert list(iter_events_reverse(path, {"user"}, block_size=block_size)) == users[::-1]
+
+
+def test_reverse_edge_cases(tmp_path):
+    path = tmp_path / "events.jsonl"
+    assert list(iter_events_reverse(path)) == []
+    path.write_text('{"n": 1}')
+    assert list(iter_events_reverse(path)) == []
+    path.write_text('\n{"n": 1}\nnot json\n\n{"n": 2}\n')
+    assert list(iter_events_reverse(path, block_size=3)) == [{"n": 2}, {"n": 1}]
+
+
+def test_tail(tmp_path, events):
+    path = tmp_path / "events.jsonl"
+    write_events(path, events)
+    assert tail(path, 3) == events[-3:]
+    assert tail(path, 2, {"tool"}) == [e for e in events if e["type"] == "tool"][-2:]
+    assert tail(path, 0) == []
+
+
+def test_tail_cost_does_not_grow_with_file(tmp_path, latency_budget):
+    path = tmp_path / "big.jsonl"
+    write_events(path, [{"type": "user", "n": i, "pad": "y" * 200} for i in range(100_000)])
+    with latency_budget(10, "session_stream.tail"):
+        assert [e["n"] for e in tail(path, 5)] == [99_995, 99_996, 99_997, 99_998, 99_999]
+
+
+def test_cursor_resumes_and_restarts(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path))
+    path = tmp_path / "events.jsonl"
+    write_events(path, [{"n": 1}, {"n": 2}], partial='{"n": 3')
+    assert [e["n"] for e in SessionCursor("s1").iter_new(path)] == [1, 2]
+    with open(path, "a") as fh:
+        fh.write('}\n{"n": 4}\n')
+    cursor = SessionCursor("s1")
+    it = cursor.iter_new(path)
+    assert next(it)["n"] == 3
+    it.close()
+    assert [e["n"] for e in SessionCursor("s1").iter_new(path)] == [4]
+    replacement = tmp_path / "new.jsonl"
+    write_events(replacement, [{"n": 10}])
+    replacement.replace(path)
+    assert [e["n"] for e in SessionCursor("s1").iter_new(path)] == [10]
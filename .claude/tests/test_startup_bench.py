@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from startup_bench import (
+    DEFAULT_BUDGET_MS,
+    bench_hook,
+    discover_hooks,
+    load_budgets,
+    main,
+    parse_importtime,
+)
+
+LIB = Path(__file__).resolve().parent.parent / "lib"
+RUNS = int(os.environ.get("CLAUDE_HOOK_BENCH_RUNS") or 5)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       730 |       1900 | functools
+not an importtime line
+"""
+
+
+def test_parse_importtime_skips_header_and_noise():
+    assert parse_importtime(SAMPLE) == {
+        "_io": {"self_us": 120, "cumulative_us": 120},
+        "functools": {"self_us": 730, "cumulative_us": 1900},
+    }
+
+
+def test_runs_must_be_positive():
+    with pytest.raises(ValueError):
+        bench_hook("anything", "{}", 0)
+    with pytest.raises(SystemExit) as exc:
+        main(["--runs", "0"])
+    assert exc.value.code == 2
+
+
+def test_malformed_budget_env_is_ignored():
+    result = subprocess.run(
+        [sys.executable, "-c", "import startup_bench; print(startup_bench.DEFAULT_BUDGET_MS)"],
+        cwd=LIB,
+        env={**os.environ, "CLAUDE_HOOK_BUDGET_MS": "fast"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "250.0"
+    assert "ignoring CLAUDE_HOOK_BUDGET_MS" in result.stderr
+
+
+@pytest.mark.parametrize("hook", discover_hooks() or [None])
+def test_hook_cold_start_within_budget(hook):
+    if hook is None:
+        pytest.skip("no hooks in .claude/hooks")
+    budgets = load_budgets(os.environ.get("CLAUDE_HOOK_BUDGETS"), DEFAULT_BUDGET_MS)
+    budget = budgets.get(hook, budgets["*"])
+    result = bench_hook(hook, "{}", RUNS)
+    p95 = result["wall_ms"]["p95"]
+    assert p95 <= budget, f"{hook} cold start p95 {p95:.1f}ms, budget {budget:g}ms"
@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import tracing
+
+LIB = Path(__file__).resolve().parent.parent / "lib"
+
+
+@pytest.fixture
+def trace_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path))
+    tracing.clear()
+    yield tmp_path
+    tracing.disable()
+    tracing.clear()
+    tracing.set_context()
+
+
+def test_disabled_spans_record_nothing_and_are_cheap(trace_env, latency_budget):
+    tracing.disable()
+
+    @tracing.traced
+    def work():
+        return 1
+
+    # Under a microsecond per span, with the loop itself included.
+    with latency_budget(100, "100k disabled spans"):
+        for _ in range(100_000):
+            with tracing.span("x"):
+                pass
+    assert work() == 1
+    assert tracing.records() == []
+
+
+def test_spans_and_traced(trace_env, trace_spans):
+    @tracing.traced("named")
+    def named():
+        with tracing.span("inner"):
+            pass
+
+    @tracing.traced
+    def bare():
+        pass
+
+    named()
+    bare()
+    names = [name for name, _ in trace_spans()]
+    assert names == ["inner", "named", f"{__name__}.test_spans_and_traced.<locals>.bare"]
+
+
+def test_latency_budget_fixture(latency_budget):
+    with latency_budget(1000, "generous") as budget:
+        pass
+    assert budget.elapsed_ms < 1000
+    with pytest.raises(tracing.LatencyBudgetExceeded, match="tight took"):
+        with latency_budget(0.001, "tight"):
+            time.sleep(0.002)
+
+
+@pytest.mark.latency_budget(1000)
+def test_latency_budget_marker():
+    pass
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+def test_flush_and_report(trace_env, fmt, capsys):
+    tracing.enable()
+    for session, hook, ms in (("s1", "a", 1), ("s1", "a", 3), ("s2", "b", 2)):
+        tracing.set_context(hook, session)
+        with tracing.span("hook"):
+            time.sleep(ms / 1000)
+        with tracing.span("refresh"):
+            pass
+    path = tracing.flush(fmt)
+    assert path.endswith(".bin" if fmt == "binary" else ".jsonl")
+    assert tracing.records() == []
+    assert [r[1:3] for r in tracing.read_records(path)][:2] == [("hook", "a"), ("refresh", "a")]
+
+    result = tracing.aggregate([path])
+    assert result["sessions"] == 2
+    assert result["hooks"]["a"]["n"] == 2 and result["hooks"]["a"]["max"] >= 3
+    assert result["spans"]["refresh"]["n"] == 3
+
+    assert tracing.main(["report", "--dir", str(tracing.trace_dir())]) == 0
+    out = capsys.readouterr().out
+    assert "p95 ms" in out and "refresh" in out
+    assert tracing.main(["report", "--json", "--dir", str(tracing.trace_dir())]) == 0
+    assert json.loads(capsys.readouterr().out)["hooks"]["b"]["n"] == 1
+
+
+def test_report_missing_dir(trace_env, capsys):
+    assert tracing.main(["report", "--dir", str(trace_env / "nope")]) == 1
+    assert "cannot read" in capsys.readouterr().err
+
+
+def test_ring_buffer_is_bounded(trace_env):
+    tracing.enable(buffer_size=8)
+    try:
+        for i in range(20):
+            with tracing.span(f"s{i}"):
+                pass
+        assert [r[1] for r in tracing.records()] == [f"s{i}" for i in range(12, 20)]
+    finally:
+        tracing.enable(buffer_size=4096)
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"CLAUDE_TRACE": "1", "CLAUDE_TRACE_BUFFER": "abc"},
+        {"CLAUDE_TRACE_SAMPLE": "fast"},
+        {"CLAUDE_TRACE_SAMPLE": "-1"},
+    ],
+)
+def test_malformed_env_is_ignored_at_import(trace_env, env):
+    result = subprocess.run(
+        [sys.executable, "-c", "import tracing; print(tracing.is_enabled())"],
+        cwd=LIB, env={**os.environ, **env}, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == str(env.get("CLAUDE_TRACE") == "1")
+    assert "ignoring CLAUDE_TRACE_" in result.stderr
+
+
+def test_sample_interval_accepts_ms_suffix(trace_env, monkeypatch):
+    monkeypatch.setenv("CLAUDE_TRACE_SAMPLE", "5ms")
+    previous = tracing.configure_from_env()
+    try:
+        assert tracing.is_enabled() and tracing._sample_interval_ns == 5_000_000
+    finally:
+        tracing.restore(previous)
+    assert not tracing.is_enabled() and tracing._sample_interval_ns == 0
+
+
+def test_run_hook_applies_forwarded_trace_flags(trace_env, monkeypatch):
+    from hook_runtime import run_hook
+
+    hooks = trace_env / ".claude" / "hooks"
+    hooks.mkdir(parents=True)
+    (hooks / "noop.py").write_text("def run(payload):\n    return None\n")
+    monkeypatch.delenv("CLAUDE_TRACE", raising=False)
+    tracing.disable()
+    run_hook("noop", '{"session_id": "s9"}', {"CLAUDE_TRACE": "1"})
+    assert [r[1:4] for r in tracing.records()] == [("hook", "noop", "s9")]
+    assert not tracing.is_enabled()
+    assert "CLAUDE_TRACE" not in os.environ
+    run_hook("noop", "{}", {"CLAUDE_PROJECT_DIR": str(trace_env)})
+    assert len(tracing.records()) == 1
@@ -0,0 +1,88 @@
+import gc
+import json
+
+import pytest
+
+import issue_store
+import write_batch
+from write_batch import AppendBuffer, StateWriter, compact_jsonl, parse_duration
+
+
+@pytest.mark.parametrize(
+    "text, seconds",
+    [("0", 0.0), ("5s", 5.0), ("250ms", 0.25), ("1m30s", 90.0), ("1.5h", 5400.0), (2, 2.0)],
+)
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text", ["", "5", "5x", "s", "1m 30s"])
+def test_parse_duration_rejects(text):
+    with pytest.raises(ValueError):
+        parse_duration(text)
+
+
+def test_zero_debounce_from_env_flushes_immediately(tmp_path, monkeypatch):
+    monkeypatch.setenv("BEADS_FLUSH_DEBOUNCE", "0")
+    path = tmp_path / "log.jsonl"
+    buffer = AppendBuffer(path, auto_flush=True)
+    buffer.append({"n": 1})
+    assert path.read_text() == '{"n":1}\n'
+
+
+def test_append_buffer_batches_until_flush(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"n":0}')  # a line a crashed writer left open
+    with AppendBuffer(path, debounce=60) as buffer:
+        buffer.append({"n": 1})
+        buffer.append('{"n":2}\n')
+        assert path.read_text() == '{"n":0}'
+    assert path.read_text().splitlines() == ['{"n":0}', '{"n":1}', '{"n":2}']
+
+
+def test_dropped_writer_is_flushed_at_exit(tmp_path):
+    path = tmp_path / "state.json"
+    writer = StateWriter(path, auto_flush=False)
+    writer.set({"a": 1})
+    del writer
+    gc.collect()
+    write_batch.flush_all()
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert not write_batch._pending_writers
+
+
+def test_compact_jsonl_keeps_one_line_per_key(tmp_path):
+    path = tmp_path / "issues.jsonl"
+    path.write_text(
+        '{"id":"a","v":0}\n{"id":"b","v":0}\n{"id":"a","v":1}\nnot json\n{"id":"b","v":3}\n'
+    )
+    assert compact_jsonl(path) == 2
+    assert path.read_text().splitlines() == ['{"id":"a","v":1}', '{"id":"b","v":3}', "not json"]
+    inode = path.stat().st_ino
+    assert compact_jsonl(path) == 0
+    assert path.stat().st_ino == inode
+    assert compact_jsonl(tmp_path / "missing.jsonl") == 0
+
+
+def test_record_issue_appends_and_reloads_incrementally(tmp_path, monkeypatch, latency_budget):
+    monkeypatch.setenv("BEADS_FLUSH_DEBOUNCE", "1h")
+    path = tmp_path / "issues.jsonl"
+    path.write_text("".join(f'{{"id":"b-{i}","status":"open"}}\n' for i in range(50_000)))
+    store = issue_store.load_store(path)
+    watcher = issue_store.IssueStore(path)
+    watcher.refresh()
+    inode = path.stat().st_ino
+    for status in ("in_progress", "closed"):
+        issue_store.record_issue({"id": "b-1", "status": status}, path)
+    with latency_budget(50, "load_store after record_issue"):
+        assert issue_store.load_store(path) is store
+    assert store.get("b-1")["status"] == "closed"
+    assert path.stat().st_ino == inode
+    assert path.read_text().endswith(
+        '{"id":"b-1","status":"in_progress"}\n{"id":"b-1","status":"closed"}\n'
+    )
+    assert watcher.refresh() == {"b-1"}
+
+    assert issue_store.compact_issues(path) == 2
+    assert watcher.refresh() == {f"b-{i}" for i in range(50_000)}
+    assert watcher.get("b-1")["status"] == "closed" and len(watcher) == 50_000